@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness for PlacementPro
+Seeds a scratch database with generate_dataset.py, boots server.py under
+uvicorn against it with the Emergent auth upstream replaced by a local stub,
+and drives realistic traffic mixes. Reports p50/p95/p99 latency, throughput
+and the MongoDB commands each route issued (from the server's /metrics) per
+scenario, and saves the run as JSON so results can be compared before and
+after a change.
+
+Usage:
+    python bench_load.py --scale small --requests 2000 --concurrency 50 --output before.json
+    python bench_load.py --skip-seed --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db') + "_loadtest"
+
+SCALES = {
+    "small": {"users": 2000, "drives": 50, "applications": 20000, "attempts": 10000},
+    "medium": {"users": 20000, "drives": 500, "applications": 200000, "attempts": 100000},
+    "large": {"users": 200000, "drives": 5000, "applications": 2000000, "attempts": 1000000},
+}
+MONGO_COMMAND_COUNT = re.compile(r'^mongodb_command_duration_seconds_count\{route="([^"]*)",[^}]*\} (\d+)$', re.M)
+
+class AuthStub:
+    """Minimal HTTP/1.1 server standing in for the OAuth session-data endpoint"""
+
+    def __init__(self, users: dict, latency: float):
+        self.users = users  # session id -> user document
+        self.latency = latency
+        self.server = None
+        self.requests = 0
+
+    async def start(self, port: int = 0) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/auth/v1/env/oauth/session-data"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if ": " in line
+                )
+                headers = {key.lower(): value for key, value in headers.items()}
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                user = self.users.get(headers.get("x-session-id", ""))
+                if user:
+                    status, body = "200 OK", json.dumps({
+                        "id": user["id"],
+                        "email": user["email"],
+                        "name": user["name"],
+                        "picture": None,
+                        "session_token": f"bench-{uuid.uuid4().hex}"
+                    })
+                else:
+                    status, body = "404 Not Found", json.dumps({"detail": "Unknown session"})
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n{body}".encode()
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+async def mongo_commands(http: httpx.AsyncClient) -> dict:
+    """MongoDB commands the server has issued so far, per route"""
+    headers = {"Authorization": f"Bearer {os.environ['METRICS_TOKEN']}"} if os.environ.get("METRICS_TOKEN") else {}
+    response = await http.get("/metrics", headers=headers)
+    response.raise_for_status()
+    counts = {}
+    for route, count in MONGO_COMMAND_COUNT.findall(response.text):
+        counts[route] = counts.get(route, 0) + int(count)
+    return counts
+
+async def run_scenario(name: str, http: httpx.AsyncClient, requests: list, concurrency: int, on_response=None) -> dict:
+    """Fire (method, url, kwargs) requests with bounded concurrency and summarise them"""
+    latencies = []
+    statuses = {}
+    errors = 0
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            method, url, kwargs = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, url, **kwargs)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                # A 401 means the session was dropped under load, not a client mistake
+                if response.status_code >= 500 or response.status_code == 401:
+                    errors += 1
+                if on_response:
+                    on_response(response)
+            except httpx.HTTPError:
+                errors += 1
+                statuses["error"] = statuses.get("error", 0) + 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    before = await mongo_commands(http)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await mongo_commands(http)
+    # Only commands issued while serving a route; background tasks are labelled "background"
+    routes = {
+        route: count - before.get(route, 0)
+        for route, count in after.items()
+        if route not in ("background", "get_metrics") and count > before.get(route, 0)
+    }
+
+    latencies.sort()
+    result = {
+        "requests": len(requests),
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(requests) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0
+        },
+        "statuses": {str(code): count for code, count in sorted(statuses.items(), key=str)},
+        "errors": errors,
+        # Scenarios run one at a time, so the per-route deltas are this scenario's
+        "mongo_ops": routes,
+    }
+    result["mongo_ops_per_request"] = round(sum(routes.values()) / max(len(requests), 1), 2)
+    print(
+        f"✓ {name:<24} {result['throughput_rps']:>8.1f} rps  "
+        f"p50 {result['latency_ms']['p50']:>7.2f}  p95 {result['latency_ms']['p95']:>7.2f}  "
+        f"p99 {result['latency_ms']['p99']:>7.2f} ms  {result['mongo_ops_per_request']:>6.2f} ops/req  "
+        f"errors {errors}"
+    )
+    return result
+
+async def prepare_fixtures(db, students: int) -> dict:
+    """Pick the users, drives and tests the scenarios use and create an admin session"""
+    users = await db.users.aggregate([
+        {"$match": {"role": "student"}},
+        {"$sample": {"size": students}},
+        {"$project": {"_id": 0, "id": 1, "email": 1, "name": 1}}
+    ]).to_list(students)
+    drives = await db.placement_drives.find(
+        {"status": "active", "application_deadline": {"$gt": datetime.now(timezone.utc)}}, {"_id": 0, "id": 1}
+    ).to_list(1000)
+    busiest = await db.applications.aggregate([
+        {"$sortByCount": "$drive_id"},
+        {"$limit": 20}
+    ]).to_list(20)
+    tests = await db.mock_tests.find({}, {"_id": 0, "id": 1, "questions.options": 1}).to_list(100)
+
+    admin_id = str(uuid.uuid4())
+    admin_token = f"bench-admin-{uuid.uuid4().hex}"
+    await db.users.insert_one({
+        "id": admin_id,
+        "email": f"{admin_id}@bench.local",
+        "name": "Bench Admin",
+        "role": "admin",
+        "created_at": datetime.now(timezone.utc)
+    })
+    await db.user_sessions.insert_one({
+        "user_id": admin_id,
+        "session_token": admin_token,
+        "expires_at": datetime.now(timezone.utc) + timedelta(hours=6),
+        "created_at": datetime.now(timezone.utc)
+    })
+    return {
+        "users": {f"bench-session-{i}": user for i, user in enumerate(users)},
+        "drive_ids": [drive["id"] for drive in drives] or [row["_id"] for row in busiest],
+        "busiest_drive_ids": [row["_id"] for row in busiest],
+        "tests": tests,
+        "admin_token": admin_token,
+    }
+
+async def wait_for_server(http: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server.py exited during startup")
+        try:
+            if (await http.get("/api/announcements")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("server.py did not become ready")
+
+def seed(scale: str, seed_value: int):
+    print(f"🌱 Seeding {db_name} at scale '{scale}'...\n")
+    args = [sys.executable, "generate_dataset.py", "--seed", str(seed_value)]
+    for key, value in SCALES[scale].items():
+        args += [f"--{key}", str(value)]
+    subprocess.run(args, cwd=ROOT_DIR, env={**os.environ, "MONGO_URL": mongo_url, "DB_NAME": db_name}, check=True)
+    print()
+
+def compare(current: dict, baseline_path: str):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\n📊 Compared with {baseline_path} ({baseline.get('label') or baseline['started_at']})")
+    for name, result in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if not previous:
+            continue
+        deltas = []
+        for key in ("p50", "p95", "p99"):
+            old, new = previous["latency_ms"][key], result["latency_ms"][key]
+            deltas.append(f"{key} {((new - old) / old * 100) if old else 0:+6.1f}%")
+        old_rps, new_rps = previous["throughput_rps"], result["throughput_rps"]
+        deltas.append(f"rps {((new_rps - old_rps) / old_rps * 100) if old_rps else 0:+6.1f}%")
+        deltas.append(f"ops/req {previous['mongo_ops_per_request']} -> {result['mongo_ops_per_request']}")
+        print(f"   {name:<24} " + "  ".join(deltas))
+
+async def run_load_test(args):
+    rng = random.Random(args.seed)
+    if not args.skip_seed:
+        seed(args.scale, args.seed)
+
+    mongo = AsyncIOMotorClient(mongo_url, tz_aware=True)
+    db = mongo[db_name]
+    fixtures = await prepare_fixtures(db, args.students)
+    stub = AuthStub(fixtures["users"], args.auth_latency)
+    auth_url = await stub.start()
+
+    # No session cap: the login storm opens more sessions per student than MAX_SESSIONS_PER_USER
+    # allows, and evicting the early ones would fail later scenarios with 401s
+    env = {**os.environ, "MONGO_URL": mongo_url, "DB_NAME": db_name, "AUTH_SESSION_URL": auth_url,
+           "MAX_SESSIONS_PER_USER": "0"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    report = {
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "database": db_name,
+        "scale": None if args.skip_seed else {"name": args.scale, **SCALES[args.scale]},
+        "concurrency": args.concurrency,
+        "scenarios": {}
+    }
+
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as http:
+            await wait_for_server(http, process)
+            print(f"🚀 Driving {base_url} ({args.requests} requests per scenario, concurrency {args.concurrency})\n")
+            scenarios = report["scenarios"]
+
+            session_ids = list(fixtures["users"])
+            logins = [("POST", "/api/auth/session", {"headers": {"X-Session-ID": session_ids[i % len(session_ids)]}})
+                      for i in range(args.requests)]
+            tokens = []
+
+            def capture_token(response):
+                if response.status_code == 200:
+                    tokens.append(response.json()["session_token"])
+            scenarios["login_storm"] = await run_scenario(
+                "login_storm", http, logins, args.concurrency, on_response=capture_token
+            )
+            if not tokens:
+                raise RuntimeError("No logins succeeded, nothing else can run")
+
+            listings = [("GET", "/api/drives", {}) for _ in range(args.requests)]
+            scenarios["drive_listing"] = await run_scenario("drive_listing", http, listings, args.concurrency)
+
+            applies = [("POST", "/api/applications", {
+                "params": {"drive_id": rng.choice(fixtures["drive_ids"])},
+                "headers": {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            }) for _ in range(args.requests)]
+            scenarios["apply_burst"] = await run_scenario("apply_burst", http, applies, args.concurrency)
+
+            submissions = []
+            for _ in range(args.requests):
+                test = rng.choice(fixtures["tests"])
+                answers = [{"question_index": i, "answer": rng.choice(q.get("options") or [""])}
+                           for i, q in enumerate(test.get("questions", []))]
+                submissions.append(("POST", "/api/tests/submit", {
+                    "json": {"test_id": test["id"], "answers": answers},
+                    "headers": {"Authorization": f"Bearer {rng.choice(tokens)}"}
+                }))
+            scenarios["test_submit_burst"] = await run_scenario("test_submit_burst", http, submissions, args.concurrency)
+
+            admin_headers = {"Authorization": f"Bearer {fixtures['admin_token']}"}
+            listings = [("GET", f"/api/applications/drive/{rng.choice(fixtures['busiest_drive_ids'])}", {
+                "params": {"limit": 100}, "headers": admin_headers
+            }) for _ in range(max(args.requests // 10, 1))]
+            scenarios["admin_applicant_listing"] = await run_scenario(
+                "admin_applicant_listing", http, listings, max(args.concurrency // 5, 1)
+            )
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        await stub.stop()
+        await db.users.delete_many({"email": {"$regex": "@bench\\.local$"}})
+        await db.user_sessions.delete_many({"session_token": {"$regex": "^bench-"}})
+        mongo.close()
+
+    report["auth_stub_requests"] = stub.requests
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test server.py against a local mongod")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data from a previous run")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--students", type=int, default=500, help="distinct students logging in")
+    parser.add_argument("--auth-latency", type=float, default=0.05, help="seconds the auth stub waits per call")
+    parser.add_argument("--port", type=int, default=8055)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default=f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run_load_test(parse_args()))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+GET /applications/my Benchmark for PlacementPro
+Compares the old per-application drive lookup with the single $lookup
+aggregation, reporting MongoDB round trips and latency per application count.
+Runs against a scratch database that is dropped afterwards.
+
+Usage: python bench_my_applications.py [--repeat 50]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db') + "_bench"
+
+os.environ.setdefault('MONGO_URL', mongo_url)
+os.environ.setdefault('DB_NAME', db_name)
+from server import ensure_indexes, my_applications_pipeline  # noqa: E402
+
+APPLICATION_COUNTS = [1, 10, 30, 60, 120]
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts commands sent to the server, getMore batches included"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+counter = RoundTripCounter()
+client = AsyncIOMotorClient(mongo_url, event_listeners=[counter])
+db = client[db_name]
+
+async def fetch_n_plus_one(user_id: str):
+    applications = await db.applications.find({"user_id": user_id}, {"_id": 0}).to_list(None)
+    for app in applications:
+        app["drive"] = await db.placement_drives.find_one({"id": app["drive_id"]}, {"_id": 0})
+    return applications
+
+async def fetch_lookup(user_id: str):
+    return await db.applications.aggregate(my_applications_pipeline(user_id, limit=1000)).to_list(None)
+
+async def seed(user_id: str, count: int):
+    await db.applications.delete_many({})
+    await db.placement_drives.delete_many({})
+    now = datetime.now(timezone.utc)
+    drives = [{
+        "id": str(uuid.uuid4()),
+        "company_name": f"Company {i}",
+        "role": "Software Engineer",
+        "description": "Benchmark drive " * 20,
+        "eligibility": "CGPA >= 7.0",
+        "ctc": "₹10-12 LPA",
+        "location": "Bangalore",
+        "application_deadline": now + timedelta(days=10),
+        "skills_required": ["Python", "SQL"],
+        "process_steps": ["Online Test", "Interview"],
+        "status": "active",
+        "created_at": now
+    } for i in range(count)]
+    await db.placement_drives.insert_many(drives)
+    await db.applications.insert_many([{
+        "id": str(uuid.uuid4()),
+        "drive_id": drive["id"],
+        "user_id": user_id,
+        "status": "applied",
+        "applied_at": now - timedelta(minutes=i),
+        "updated_at": now
+    } for i, drive in enumerate(drives)])
+
+async def measure(fetch, user_id: str, repeat: int):
+    await fetch(user_id)  # warm up
+    timings = []
+    counter.count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fetch(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return counter.count / repeat, statistics.median(timings), statistics.quantiles(timings, n=20)[-1]
+
+async def run_benchmark(repeat: int):
+    print(f"⏱️  Benchmarking GET /applications/my against {db_name} ({repeat} runs each)\n")
+
+    try:
+        await ensure_indexes(db)
+        user_id = str(uuid.uuid4())
+        print(f"{'apps':>6} | {'N+1 trips':>9} {'p50 ms':>8} {'p95 ms':>8} | {'$lookup trips':>13} {'p50 ms':>8} {'p95 ms':>8}")
+        print("-" * 76)
+        for count in APPLICATION_COUNTS:
+            await seed(user_id, count)
+            old_trips, old_p50, old_p95 = await measure(fetch_n_plus_one, user_id, repeat)
+            new_trips, new_p50, new_p95 = await measure(fetch_lookup, user_id, repeat)
+            print(f"{count:>6} | {old_trips:>9.0f} {old_p50:>8.2f} {old_p95:>8.2f} | {new_trips:>13.0f} {new_p50:>8.2f} {new_p95:>8.2f}")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 50
+    asyncio.run(run_benchmark(repeat))
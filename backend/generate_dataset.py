@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator for PlacementPro
+Builds a production-scale dataset from the sample drives and mock tests in
+seed_database.py: users, student profiles, placement drives, mock tests,
+applications and test attempts. The same --seed and --epoch always produce
+the same data.
+
+Usage:
+    python generate_dataset.py --users 200000 --drives 5000 \
+        --applications 2000000 --attempts 1000000 --parallelism 8
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from seed_database import client, db, db_name, mongo_url, placement_drives as sample_drives, mock_tests as sample_tests
+
+os.environ.setdefault('MONGO_URL', mongo_url)
+os.environ.setdefault('DB_NAME', db_name)
+from server import ensure_indexes, parse_ctc, parse_eligibility  # noqa: E402
+
+COLLEGES = ["IIT Bombay", "IIT Delhi", "NIT Trichy", "BITS Pilani", "VIT Vellore", "DTU", "IIIT Hyderabad", "COEP Pune"]
+DEGREES = ["B.Tech CS", "B.Tech IT", "B.Tech ECE", "M.Tech CS", "MCA", "B.Sc Mathematics"]
+LOCATIONS = ["Bangalore", "Hyderabad", "Pune", "Chennai", "Gurgaon", "Mumbai", "Noida", "Remote"]
+STATUS_WEIGHTS = {"applied": 60, "shortlisted": 20, "rejected": 15, "selected": 5}
+SKILL_POOL = sorted({skill for drive in sample_drives for skill in drive["skills_required"]} | {
+    "JavaScript", "React", "Node.js", "Go", "Kubernetes", "Docker", "Machine Learning", "Statistics", "Linux", "Git"
+})
+
+class Generator:
+    """Deterministic document factory, every id and value comes from one seeded RNG"""
+
+    def __init__(self, seed: int, now: datetime):
+        self.rng = random.Random(seed)
+        self.now = now
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def past(self, days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def user(self, i: int) -> dict:
+        return {
+            "id": self.uuid(),
+            "email": f"student{i}@example.edu",
+            "name": f"Student {i}",
+            "picture": None,
+            "role": "student",
+            "created_at": self.past(720)
+        }
+
+    def profile(self, user: dict) -> dict:
+        return {
+            "id": self.uuid(),
+            "user_id": user["id"],
+            "phone": f"+91{self.rng.randint(7000000000, 9999999999)}",
+            "college": self.rng.choice(COLLEGES),
+            "degree": self.rng.choice(DEGREES),
+            "graduation_year": self.rng.randint(2024, 2028),
+            "skills": self.rng.sample(SKILL_POOL, self.rng.randint(2, 8)),
+            "resume_url": None,
+            "cgpa": round(self.rng.uniform(5.5, 10.0), 2),
+            "updated_at": self.past(180)
+        }
+
+    def drive(self, i: int) -> dict:
+        template = sample_drives[i % len(sample_drives)]
+        low = self.rng.randint(4, 30)
+        # Recent drives stay open so apply traffic has somewhere to go
+        active = self.rng.random() < 0.3
+        created_at = self.past(30 if active else 365)
+        ctc = f"₹{low}-{low + self.rng.randint(2, 10)} LPA"
+        ctc_min, ctc_max = parse_ctc(ctc)
+        eligibility = f"CGPA >= {self.rng.choice([6.0, 6.5, 7.0, 7.5, 8.0])}"
+        return {
+            "id": self.uuid(),
+            "company_name": f"{template['company_name']} {i // len(sample_drives)}" if i >= len(sample_drives) else template["company_name"],
+            "company_logo": template.get("company_logo"),
+            "role": template["role"],
+            "description": template["description"],
+            "eligibility": eligibility,
+            "eligibility_rules": parse_eligibility(eligibility),
+            "ctc": ctc,
+            "ctc_min": ctc_min,
+            "ctc_max": ctc_max,
+            "location": self.rng.choice(LOCATIONS),
+            "application_deadline": created_at + timedelta(days=self.rng.randint(7, 45)),
+            "interview_date": created_at + timedelta(days=self.rng.randint(50, 70)),
+            "skills_required": self.rng.sample(SKILL_POOL, self.rng.randint(3, 6)),
+            "process_steps": template["process_steps"],
+            "status": "active" if active else "closed",
+            "created_at": created_at
+        }
+
+    def test(self, i: int) -> dict:
+        template = sample_tests[i % len(sample_tests)]
+        return {
+            "id": self.uuid(),
+            "title": f"{template['title']} #{i + 1}",
+            "category": template["category"],
+            "duration": template["duration"],
+            "questions": template["questions"],
+            "created_at": self.past(365)
+        }
+
+    def application(self, user_id: str, drive_id: str) -> dict:
+        applied_at = self.past(365)
+        status = self.rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+        return {
+            "id": self.uuid(),
+            "drive_id": drive_id,
+            "user_id": user_id,
+            "status": status,
+            "applied_at": applied_at,
+            "updated_at": applied_at if status == "applied" else applied_at + timedelta(days=self.rng.randint(1, 30))
+        }
+
+    def attempt(self, user_id: str, test: dict) -> dict:
+        total = len(test["questions"])
+        answers = [
+            {"question_index": q, "answer": self.rng.choice(question["options"])}
+            for q, question in enumerate(test["questions"])
+        ]
+        return {
+            "id": self.uuid(),
+            "test_id": test["id"],
+            "user_id": user_id,
+            "score": sum(a["answer"] == q.get("correct_answer") for a, q in zip(answers, test["questions"])),
+            "total": total,
+            "answers": answers,
+            "attempted_at": self.past(365)
+        }
+
+def spread(total: int, buckets: int, rng: random.Random):
+    """Split total into buckets counts that differ by at most one, in shuffled order"""
+    base, extra = divmod(total, buckets)
+    counts = [base + 1] * extra + [base] * (buckets - extra)
+    rng.shuffle(counts)
+    return counts
+
+def popularity(count: int, skew: float, rng: random.Random):
+    """Zipf weights 1/rank**skew handed out to count items in shuffled order"""
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+def weighted_sample(weights: list, cum_weights: list, k: int, rng: random.Random):
+    """k distinct indexes drawn by weight, without replacement"""
+    if k * 2 > len(weights):
+        # Efraimidis-Spirakis keys, O(n) but only needed when k is close to n
+        return heapq.nlargest(k, range(len(weights)), key=lambda i: rng.random() ** (1 / weights[i]))
+    # Redraw collisions; cheap while k is small next to n
+    picked = set()
+    population = range(len(weights))
+    while len(picked) < k:
+        picked.update(rng.choices(population, cum_weights=cum_weights, k=k - len(picked)))
+    return list(picked)
+
+class BatchWriter:
+    """insert_many batches with at most `parallelism` writes in flight"""
+
+    def __init__(self, batch_size: int, parallelism: int):
+        self.batch_size = batch_size
+        self.parallelism = parallelism
+        self.in_flight = set()
+        self.inserted = {}
+        self.started = {}
+
+    async def write(self, collection: str, docs):
+        self.started.setdefault(collection, time.perf_counter())
+        batch = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                await self._submit(collection, batch)
+                batch = []
+        if batch:
+            await self._submit(collection, batch)
+
+    async def _submit(self, collection: str, batch: list):
+        while len(self.in_flight) >= self.parallelism:
+            done, self.in_flight = await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        self.in_flight.add(asyncio.create_task(self._insert(collection, batch)))
+        # Let the new write reach the wire before generating the next batch
+        await asyncio.sleep(0)
+
+    async def _insert(self, collection: str, batch: list):
+        await db[collection].insert_many(batch, ordered=False)
+        self.inserted[collection] = self.inserted.get(collection, 0) + len(batch)
+
+    async def drain(self, collection: str):
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight)
+            self.in_flight.clear()
+        elapsed = time.perf_counter() - self.started.get(collection, time.perf_counter())
+        count = self.inserted.get(collection, 0)
+        print(f"✓ {collection:<17} {count:>10,} docs in {elapsed:7.1f}s ({count / max(elapsed, 1e-6):>9,.0f} docs/s)")
+
+async def generate_dataset(args):
+    epoch = datetime.fromisoformat(args.epoch).replace(tzinfo=timezone.utc)
+    print(f"🏭 Generating synthetic data into {db_name} (seed {args.seed}, epoch {epoch.date()})...\n")
+    gen = Generator(args.seed, epoch)
+    writer = BatchWriter(args.batch_size, args.parallelism)
+    started = time.perf_counter()
+
+    try:
+        if args.drop:
+            print("🗑️  Dropping existing collections...")
+            for collection in ("users", "student_profiles", "placement_drives", "mock_tests",
+                               "applications", "test_attempts", "user_sessions", "stats"):
+                await db[collection].drop()
+            print("✓ Collections dropped\n")
+
+        user_ids = []
+
+        def users():
+            for i in range(args.users):
+                user = gen.user(i)
+                user_ids.append(user["id"])
+                yield user
+        await writer.write("users", users())
+        await writer.drain("users")
+
+        # Profiles are rebuilt from the same ids, one per user
+        await writer.write("student_profiles", (gen.profile({"id": user_id}) for user_id in user_ids))
+        await writer.drain("student_profiles")
+
+        drives = [gen.drive(i) for i in range(args.drives)]
+        drive_ids = [drive["id"] for drive in drives]
+        await writer.write("placement_drives", drives)
+        await writer.drain("placement_drives")
+        del drives
+
+        tests = [gen.test(i) for i in range(args.tests)]
+        await writer.write("mock_tests", [dict(test) for test in tests])
+        await writer.drain("mock_tests")
+
+        # Each user applies to distinct drives, so (drive_id, user_id) stays unique.
+        # Drive popularity is Zipf-skewed: a few drives draw thousands of applicants, most a handful
+        per_user = spread(min(args.applications, args.users * args.drives), args.users, gen.rng)
+        weights = popularity(args.drives, args.popularity_skew, gen.rng) if args.popularity_skew > 0 else None
+        cum_weights = list(itertools.accumulate(weights)) if weights else None
+
+        def applications():
+            for user_id, count in zip(user_ids, per_user):
+                if weights:
+                    drive_indexes = weighted_sample(weights, cum_weights, count, gen.rng)
+                else:
+                    drive_indexes = gen.rng.sample(range(args.drives), count)
+                for drive_index in drive_indexes:
+                    yield gen.application(user_id, drive_ids[drive_index])
+        await writer.write("applications", applications())
+        await writer.drain("applications")
+
+        per_user = spread(args.attempts, args.users, gen.rng)
+
+        def attempts():
+            for user_id, count in zip(user_ids, per_user):
+                for _ in range(count):
+                    yield gen.attempt(user_id, gen.rng.choice(tests))
+        await writer.write("test_attempts", attempts())
+        await writer.drain("test_attempts")
+
+        print("\n📇 Building indexes...")
+        index_started = time.perf_counter()
+        failed = await ensure_indexes(db)
+        if failed:
+            print(f"⚠️  Could not create: {', '.join(failed)}")
+        print(f"✓ Indexes ready in {time.perf_counter() - index_started:.1f}s")
+
+        total = sum(writer.inserted.values())
+        elapsed = time.perf_counter() - started
+        print(f"\n✨ Generated {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s overall)")
+    except Exception as e:
+        print(f"❌ Error generating data: {str(e)}")
+        raise
+    finally:
+        client.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic PlacementPro dataset")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--drives", type=int, default=50)
+    parser.add_argument("--applications", type=int, default=20000)
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--tests", type=int, default=20)
+    parser.add_argument("--popularity-skew", type=float, default=0.8,
+                        help="Zipf exponent of drive popularity, 0 spreads applications evenly")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--epoch", default=datetime.now(timezone.utc).date().isoformat(),
+                        help="date all generated timestamps are relative to (default: today)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--parallelism", type=int, default=8)
+    parser.add_argument("--no-drop", dest="drop", action="store_false", help="append instead of replacing existing data")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(generate_dataset(parse_args()))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Date Migration Script for PlacementPro
+Rewrites ISO-8601 string dates as native BSON dates, collection by collection,
+in _id order and in small batches so it can run while the server is live.
+Progress is checkpointed in the `migrations` collection; re-running resumes
+where the last run stopped.
+
+Usage: python migrate_datetimes.py [--batch-size 1000] [--restart]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db')
+
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
+db = client[db_name]
+
+os.environ.setdefault('MONGO_URL', mongo_url)
+os.environ.setdefault('DB_NAME', db_name)
+from server import DATE_FIELDS, as_datetime  # noqa: E402
+
+MIGRATION_ID = "datetimes"
+
+async def migrate_collection(collection: str, fields: list, batch_size: int) -> int:
+    checkpoint_id = f"{MIGRATION_ID}:{collection}"
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id}) or {}
+    if checkpoint.get("done"):
+        print(f"✓ {collection}: already migrated")
+        return 0
+
+    converted = checkpoint.get("converted", 0)
+    last_id = checkpoint.get("last_id")
+    pending = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    started = time.perf_counter()
+
+    while True:
+        query = {"$and": [pending, {"_id": {"$gt": last_id}}]} if last_id else pending
+        batch = await db[collection].find(query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            updates = {}
+            for field in fields:
+                value = doc.get(field)
+                if isinstance(value, str):
+                    try:
+                        updates[field] = as_datetime(value)
+                    except ValueError:
+                        print(f"⚠️  {collection} {doc['_id']}: unparseable {field}={value!r}, left as is")
+            if updates:
+                # Match on the old values so a concurrent rewrite by the server is never clobbered
+                match = {"_id": doc["_id"], **{field: doc[field] for field in updates}}
+                operations.append(UpdateOne(match, {"$set": updates}))
+
+        if operations:
+            result = await db[collection].bulk_write(operations, ordered=False)
+            converted += result.modified_count
+        last_id = batch[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "converted": converted}},
+            upsert=True
+        )
+        rate = converted / max(time.perf_counter() - started, 1e-6)
+        print(f"   {collection}: {converted} documents converted ({rate:.0f}/s)", end="\r")
+
+    await db.migrations.update_one({"_id": checkpoint_id}, {"$set": {"done": True, "converted": converted}}, upsert=True)
+    print(f"✓ {collection}: {converted} documents converted" + " " * 20)
+    return converted
+
+async def migrate_datetimes(batch_size: int, restart: bool):
+    print("🕒 Migrating string dates to BSON dates...\n")
+
+    try:
+        if restart:
+            await db.migrations.delete_many({"_id": {"$regex": f"^{MIGRATION_ID}:"}})
+
+        total = 0
+        for collection, fields in DATE_FIELDS.items():
+            total += await migrate_collection(collection, fields, batch_size)
+
+        print(f"\n✨ Migration completed, {total} documents converted")
+    except Exception as e:
+        print(f"\n❌ Migration stopped: {str(e)}")
+        print("   Re-run the script to resume from the last checkpoint.")
+        raise
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[sys.argv.index("--batch-size") + 1]) if "--batch-size" in sys.argv else 1000
+    asyncio.run(migrate_datetimes(batch_size, restart="--restart" in sys.argv))
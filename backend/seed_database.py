@@ -32,12 +32,12 @@ placement_drives = [
         "eligibility": "B.Tech/M.Tech in CS/IT with CGPA >= 7.5",
         "ctc": "₹25-30 LPA",
         "location": "Bangalore, India",
-        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=15)).isoformat(),
-        "interview_date": (datetime.now(timezone.utc) + timedelta(days=25)).isoformat(),
+        "application_deadline": datetime.now(timezone.utc) + timedelta(days=15),
+        "interview_date": datetime.now(timezone.utc) + timedelta(days=25),
         "skills_required": ["Java", "Python", "Data Structures", "Algorithms", "System Design"],
         "process_steps": ["Online Test", "Technical Interview 1", "Technical Interview 2", "HR Interview"],
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -47,12 +47,12 @@ placement_drives = [
         "eligibility": "B.Tech/M.Tech in CS/IT/ECE with CGPA >= 7.0",
         "ctc": "₹22-28 LPA",
         "location": "Hyderabad, India",
-        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=20)).isoformat(),
-        "interview_date": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+        "application_deadline": datetime.now(timezone.utc) + timedelta(days=20),
+        "interview_date": datetime.now(timezone.utc) + timedelta(days=30),
         "skills_required": ["C++", "C#", ".NET", "Azure", "Problem Solving"],
         "process_steps": ["Aptitude Test", "Coding Round", "Technical Interview", "Manager Round"],
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -62,12 +62,12 @@ placement_drives = [
         "eligibility": "B.Tech in CS/IT with CGPA >= 7.0, Strong coding skills",
         "ctc": "₹28-35 LPA",
         "location": "Bangalore/Hyderabad",
-        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=12)).isoformat(),
-        "interview_date": (datetime.now(timezone.utc) + timedelta(days=22)).isoformat(),
+        "application_deadline": datetime.now(timezone.utc) + timedelta(days=12),
+        "interview_date": datetime.now(timezone.utc) + timedelta(days=22),
         "skills_required": ["Java", "Python", "AWS", "Data Structures", "OOP"],
         "process_steps": ["Online Assessment", "Technical Round 1", "Technical Round 2", "Bar Raiser"],
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -77,12 +77,12 @@ placement_drives = [
         "eligibility": "B.Tech/M.Tech in CS/IT/Mathematics with CGPA >= 8.0",
         "ctc": "₹20-25 LPA",
         "location": "Bangalore",
-        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=18)).isoformat(),
-        "interview_date": (datetime.now(timezone.utc) + timedelta(days=28)).isoformat(),
+        "application_deadline": datetime.now(timezone.utc) + timedelta(days=18),
+        "interview_date": datetime.now(timezone.utc) + timedelta(days=28),
         "skills_required": ["Java", "C++", "Database", "Algorithms", "Problem Solving"],
         "process_steps": ["HackerRank Test", "Technical Interview 1", "Technical Interview 2", "HR Round"],
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -92,12 +92,12 @@ placement_drives = [
         "eligibility": "B.Tech in CS/IT with CGPA >= 7.5",
         "ctc": "₹18-24 LPA",
         "location": "Bangalore",
-        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=10)).isoformat(),
-        "interview_date": (datetime.now(timezone.utc) + timedelta(days=20)).isoformat(),
+        "application_deadline": datetime.now(timezone.utc) + timedelta(days=10),
+        "interview_date": datetime.now(timezone.utc) + timedelta(days=20),
         "skills_required": ["Java", "Spring Boot", "Microservices", "SQL", "NoSQL"],
         "process_steps": ["Coding Test", "Technical Round 1", "Technical Round 2", "Hiring Manager"],
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
 ]
 
@@ -135,7 +135,7 @@ mock_tests = [
                 "correct_answer": "10"
             }
         ],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -164,7 +164,7 @@ mock_tests = [
                 "correct_answer": "12"
             }
         ],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -193,7 +193,7 @@ mock_tests = [
                 "correct_answer": "Queue"
             }
         ],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -222,7 +222,7 @@ mock_tests = [
                 "correct_answer": "append()"
             }
         ],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
 ]
 
@@ -235,7 +235,7 @@ resources = [
         "category": "Technical",
         "type": "pdf",
         "url": "https://example.com/dsa-guide.pdf",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -244,7 +244,7 @@ resources = [
         "category": "Technical",
         "type": "video",
         "url": "https://www.youtube.com/watch?v=example",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -253,7 +253,7 @@ resources = [
         "category": "Career",
         "type": "link",
         "url": "https://example.com/resume-tips",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -262,7 +262,7 @@ resources = [
         "category": "Interview",
         "type": "pdf",
         "url": "https://example.com/behavioral-questions.pdf",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -271,7 +271,7 @@ resources = [
         "category": "Aptitude",
         "type": "pdf",
         "url": "https://example.com/aptitude-papers.pdf",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
@@ -280,7 +280,7 @@ resources = [
         "category": "Technical",
         "type": "link",
         "url": "https://leetcode.com/problemset/top-100-liked/",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
 ]
 
@@ -291,28 +291,28 @@ announcements = [
         "title": "🎉 Google On-Campus Drive Scheduled for Next Month",
         "content": "Google will be conducting on-campus recruitment. Eligible students, please apply before the deadline.",
         "priority": "high",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     },
     {
         "id": str(uuid.uuid4()),
         "title": "📚 New Mock Test Series Added - Practice Now!",
         "content": "We've added new aptitude and technical mock tests. Start practicing to improve your scores.",
         "priority": "normal",
-        "created_at": (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        "created_at": datetime.now(timezone.utc) - timedelta(days=1)
     },
     {
         "id": str(uuid.uuid4()),
         "title": "⚠️ Resume Submission Deadline Extended",
         "content": "The deadline for resume submission has been extended by 3 days. Update your profiles.",
         "priority": "high",
-        "created_at": (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+        "created_at": datetime.now(timezone.utc) - timedelta(days=2)
     },
     {
         "id": str(uuid.uuid4()),
         "title": "💼 Career Counseling Session This Friday",
         "content": "Join us for a career counseling session with industry experts. Register in the resources section.",
         "priority": "normal",
-        "created_at": (datetime.now(timezone.utc) - timedelta(days=3)).isoformat()
+        "created_at": datetime.now(timezone.utc) - timedelta(days=3)
     }
 ]
 
@@ -1,23 +1,106 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Header, Response, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Response, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne, ReturnDocument, monitoring
+from pymongo.errors import OperationFailure, DuplicateKeyError, PyMongoError, BulkWriteError
 import os
+import re
+import io
+import csv
+import asyncio
+import json
+import base64
+import hashlib
 import logging
+import glob
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional
 import uuid
+import time
+import bisect
+import random
+import operator
+import threading
+import contextvars
+import heapq
+from array import array
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
 import httpx
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# QueryProfile of the request being served, set only when QUERY_PROFILE is on.
+# Motor copies the context into its executor threads, so the listener sees it.
+current_profile = contextvars.ContextVar("current_profile", default=None)
+# ASGI scope of the request being served, set by MetricsMiddleware; None in background tasks
+current_scope = contextvars.ContextVar("current_scope", default=None)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts and times every command per (route, collection, command name)"""
+
+    def __init__(self):
+        # Motor runs commands on executor threads
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.latency = {}
+        self.failures = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        return target if isinstance(target, str) else ""
+
+    @staticmethod
+    def _route() -> str:
+        scope = current_scope.get()
+        if scope is None:
+            return "background"
+        return getattr(scope.get("endpoint"), "__name__", "unmatched")
+
+    def started(self, event):
+        collection = self._collection(event)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record(collection, event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                self._route(), collection, event.command_name, profile, event
+            )
+
+    def succeeded(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending:
+                self.latency.setdefault(pending[:3], LatencyHistogram()).observe(event.duration_micros / 1e6)
+        if pending and pending[3] is not None:
+            pending[3].finished(pending[4], event.duration_micros / 1e6)
+
+    def failed(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending:
+                key = pending[:3]
+                self.latency.setdefault(key, LatencyHistogram()).observe(event.duration_micros / 1e6)
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                key: (histogram.snapshot(), self.failures.get(key, 0))
+                for key, histogram in self.latency.items()
+            }
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_metrics = MongoCommandMetrics()
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[mongo_metrics])
 db = client[os.environ['DB_NAME']]
 
 app = FastAPI()
@@ -67,6 +150,9 @@ class PlacementDrive(BaseModel):
     interview_date: Optional[datetime] = None
     skills_required: List[str] = []
     process_steps: List[str] = []
+    ctc_min: Optional[float] = None  # LPA, parsed from ctc for range filters
+    ctc_max: Optional[float] = None
+    eligibility_rules: dict = {}  # parsed from eligibility, see parse_eligibility()
     status: str = "active"  # active, closed
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -124,7 +210,7 @@ class ProfileUpdateRequest(BaseModel):
     phone: Optional[str] = None
     college: Optional[str] = None
     degree: Optional[str] = None
-    graduation_year: Optional[int] = None
+    graduation_year: Optional[int] = Field(None, ge=1900, le=2100)
     skills: Optional[List[str]] = None
     cgpa: Optional[float] = None
 
@@ -144,6 +230,15 @@ class DriveCreateRequest(BaseModel):
 class ApplicationStatusUpdate(BaseModel):
     status: str
 
+class BulkStatusUpdateRequest(BaseModel):
+    status: str
+    # Either explicit application ids, or a drive plus optional filters
+    application_ids: Optional[List[str]] = None
+    drive_id: Optional[str] = None
+    from_status: Optional[str] = None
+    min_cgpa: Optional[float] = None
+    skills: Optional[List[str]] = None
+
 class TestSubmission(BaseModel):
     test_id: str
     answers: List[dict]
@@ -160,30 +255,762 @@ class AnnouncementCreateRequest(BaseModel):
     content: str
     priority: str = "normal"
 
-# Auth Helper
-async def get_current_user(authorization: Optional[str] = Header(None), request: Request = None) -> User:
-    session_token = None
+class RoleUpdateRequest(BaseModel):
+    role: str
+
+# In-process caches
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def evict_where(self, predicate) -> int:
+        """Drop every entry for which predicate(key, value) holds, returns the count"""
+        keys = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Metrics
+class LatencyHistogram:
+    """Cumulative latency histogram in seconds, Prometheus-style buckets"""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        i = bisect.bisect_left(self.buckets, seconds)
+        if i < len(self.counts):
+            self.counts[i] += 1
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+class RouteMetrics:
+    """Per-route latency histograms and response counts, recorded by MetricsMiddleware"""
+
+    def __init__(self):
+        self.latency = {}  # (route, method) -> LatencyHistogram
+        self.responses = {}  # (route, method, status) -> count
+
+    def observe(self, route: str, method: str, status: int, seconds: float):
+        self.latency.setdefault((route, method), LatencyHistogram()).observe(seconds)
+        key = (route, method, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+route_metrics = RouteMetrics()
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request to its last body byte, labelled by endpoint function name"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_scope.reset(token)
+            # The router stores the matched endpoint in the shared scope
+            route = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            route_metrics.observe(route, scope["method"], status, time.perf_counter() - started)
+
+def prometheus_labels(**labels) -> str:
+    return ",".join(f'{name}="{str(value)}"' for name, value in labels.items())
+
+def prometheus_histogram(lines: list, name: str, snapshot: dict, **labels):
+    prefix = prometheus_labels(**labels)
+    for bound, count in snapshot["buckets"].items():
+        lines.append(f'{name}_bucket{{{prefix}{"," if prefix else ""}le="{bound}"}} {count}')
+    suffix = f"{{{prefix}}}" if prefix else ""
+    lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+# Query profiling (development)
+# off: nothing recorded. log: warn about repeated query shapes, slow commands and
+# blown query budgets. strict: like log, but a blown budget raises, failing tests.
+QUERY_PROFILE = os.environ.get('QUERY_PROFILE', 'off').lower()
+QUERY_PROFILE_REPEAT_THRESHOLD = int(os.environ.get('QUERY_PROFILE_REPEAT_THRESHOLD', '5'))
+QUERY_PROFILE_SLOW_MS = float(os.environ.get('QUERY_PROFILE_SLOW_MS', '100'))
+
+# Cursor bookkeeping, not new queries
+UNPROFILED_COMMANDS = {"getMore", "killCursors", "endSessions"}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+SHAPE_FIELDS = ("filter", "query", "pipeline", "updates", "deletes", "sort")
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+def query_budget(limit: int):
+    """Declare the most MongoDB commands (auth included, getMore excluded) a route may issue"""
+    def declare(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+    return declare
+
+def query_shape(value):
+    """The structure of a filter or pipeline with every literal replaced by ?"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Keep pipeline stages and $or branches, collapse lists of literals like $in values
+        return [query_shape(item) for item in value if isinstance(item, (dict, list, tuple))] or ["?"]
+    return "?"
+
+class QueryProfile:
+    """Commands issued while one request is served"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = 0
+        self.shapes = {}
+        self.slow = []
+
+    def record(self, collection: str, command_name: str, command: dict):
+        if command_name in UNPROFILED_COMMANDS:
+            return
+        shape = {field: query_shape(command[field]) for field in SHAPE_FIELDS if field in command}
+        key = f"{collection}.{command_name} {json.dumps(shape, sort_keys=True)}"
+        with self._lock:
+            self.commands += 1
+            self.shapes[key] = self.shapes.get(key, 0) + 1
+
+    def finished(self, event, seconds: float):
+        if seconds * 1000 >= QUERY_PROFILE_SLOW_MS and event.command_name in EXPLAINABLE_COMMANDS:
+            with self._lock:
+                self.slow.append((event.database_name, dict(event.command), seconds))
+
+    def repeated(self, threshold: int) -> dict:
+        return {shape: count for shape, count in self.shapes.items() if count > threshold}
+
+def winning_plan(explain: dict):
+    planner = explain.get("queryPlanner")
+    if not planner:
+        # Aggregations nest the find-layer plan in their first stage
+        planner = next((stage["$cursor"].get("queryPlanner", {}) for stage in explain.get("stages", []) if "$cursor" in stage), {})
+    return planner.get("winningPlan", explain)
+
+async def log_slow_command(route: str, database_name: str, command: dict, seconds: float):
+    command_name = next(iter(command))
+    # Session and transport fields are not valid inside explain
+    command = {key: value for key, value in command.items()
+               if not key.startswith("$") and key not in ("lsid", "txnNumber", "readConcern", "writeConcern")}
+    try:
+        explain = await client[database_name].command({"explain": command, "verbosity": "queryPlanner"})
+        plan = json.dumps(winning_plan(explain), default=str)
+    except OperationFailure as e:
+        plan = f"explain failed: {e}"
+    logger.warning("Slow %s on %s.%s in %s: %.1f ms, plan %s",
+                   command_name, database_name, command.get(command_name), route, seconds * 1000, plan)
+
+class QueryProfilerMiddleware:
+    """Profiles the MongoDB commands of each request when QUERY_PROFILE is on"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_profile.reset(token)
+        
+        endpoint = scope.get("endpoint")
+        route = getattr(endpoint, "__name__", "unmatched")
+        for shape, count in profile.repeated(QUERY_PROFILE_REPEAT_THRESHOLD).items():
+            logger.warning("Possible N+1 in %s: %d x %s", route, count, shape)
+        for slow in profile.slow:
+            await log_slow_command(route, *slow)
+        
+        budget = getattr(endpoint, "query_budget", None)
+        if budget is not None and profile.commands > budget:
+            message = f"{route} issued {profile.commands} MongoDB commands, budget is {budget}"
+            if QUERY_PROFILE == "strict":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+# Session token -> (User, expires_at). Entries never outlive the session itself.
+session_cache = TTLCache(
+    maxsize=int(os.environ.get('SESSION_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('SESSION_CACHE_TTL', '60'))
+)
+
+def evict_user_sessions(user_id: str) -> int:
+    """Drop every cached session of a user, e.g. after a role change"""
+    return session_cache.evict_where(lambda token, entry: entry[0].id == user_id)
+
+# Indexes
+# (collection, keys, options) for every lookup the routes below perform
+INDEXES = [
+    ("user_sessions", [("session_token", ASCENDING)], {"unique": True}),
+    ("user_sessions", [("user_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("user_sessions", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("users", [("id", ASCENDING)], {"unique": True}),
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("users", [("role", ASCENDING)], {}),
+    ("student_profiles", [("user_id", ASCENDING)], {"unique": True}),
+    ("placement_drives", [("id", ASCENDING)], {"unique": True}),
+    ("placement_drives", [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("placement_drives", [("status", ASCENDING), ("company_name", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("placement_drives", [("status", ASCENDING), ("location", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("placement_drives", [("status", ASCENDING), ("application_deadline", ASCENDING)], {}),
+    ("placement_drives", [("status", ASCENDING), ("company_name", TEXT), ("role", TEXT), ("description", TEXT)],
+     {"name": "drive_search", "weights": {"company_name": 10, "role": 5, "description": 1}}),
+    ("placement_drives", [("status", ASCENDING), ("skills_required", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("placement_drives", [("status", ASCENDING), ("ctc_max", ASCENDING), ("ctc_min", ASCENDING)], {}),
+    ("applications", [("id", ASCENDING)], {"unique": True}),
+    ("applications", [("drive_id", ASCENDING), ("user_id", ASCENDING)], {"unique": True}),
+    ("applications", [("drive_id", ASCENDING), ("applied_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("applications", [("user_id", ASCENDING), ("applied_at", DESCENDING)], {}),
+    ("applications", [("status", ASCENDING), ("applied_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("mock_tests", [("id", ASCENDING)], {"unique": True}),
+    ("mock_tests", [("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("test_attempts", [("id", ASCENDING)], {"unique": True}),
+    ("test_attempts", [("user_id", ASCENDING), ("attempted_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("test_attempts", [("test_id", ASCENDING)], {}),
+    ("resources", [("id", ASCENDING)], {"unique": True}),
+    ("resources", [("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("announcements", [("created_at", DESCENDING)], {}),
+]
+
+async def ensure_indexes(database=None) -> List[str]:
+    """Create any missing index from INDEXES, returns the names that failed"""
+    database = db if database is None else database
+    failed = []
+    for collection, keys, options in INDEXES:
+        try:
+            await database[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            # Usually a unique index over existing duplicates; keep serving and report it
+            name = f"{collection}." + "_".join(f"{field}_{direction}" for field, direction in keys)
+            logging.getLogger(__name__).error("Failed to create index %s: %s", name, e)
+            failed.append(name)
+    return failed
+
+# Dates
+# Every date field per collection. They are stored as BSON dates; documents written
+# before migrate_datetimes.py ran may still hold ISO-8601 strings.
+DATE_FIELDS = {
+    "users": ["created_at"],
+    "user_sessions": ["expires_at", "created_at"],
+    "student_profiles": ["updated_at"],
+    "placement_drives": ["created_at", "application_deadline", "interview_date"],
+    "applications": ["applied_at", "updated_at"],
+    "mock_tests": ["created_at"],
+    "test_attempts": ["attempted_at"],
+    "resources": ["created_at"],
+    "announcements": ["created_at"],
+}
+DATE_FIELD_NAMES = {field for fields in DATE_FIELDS.values() for field in fields}
+
+def as_utc(value: datetime) -> datetime:
+    """Naive datetimes from clients are taken to be UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def as_datetime(value):
+    """Read a stored date that may still be a legacy ISO-8601 string"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        return as_utc(value)
+    return value
+
+def date_range(field: str, gte: Optional[datetime] = None, lte: Optional[datetime] = None) -> dict:
+    """Range match on a date field that also covers legacy string values"""
+    native, legacy = {}, {}
+    if gte:
+        native["$gte"] = as_utc(gte)
+        legacy["$gte"] = as_utc(gte).isoformat()
+    if lte:
+        native["$lte"] = as_utc(lte)
+        legacy["$lte"] = as_utc(lte).isoformat()
+    return {"$or": [{field: native}, {field: legacy}]}
+
+# Pagination
+MAX_PAGE_SIZE = 500
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def encode_cursor(values: list) -> str:
+    """Opaque cursor holding the sort key of the last row of a page"""
+    raw = json.dumps([{"$date": v.isoformat()} if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(cursor)
+        return [datetime.fromisoformat(v["$date"]) if isinstance(v, dict) else v for v in values]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(fields: List[str], values: list, direction: int) -> dict:
+    """Match rows strictly after values in a (fields..., direction) sort"""
+    op = "$gt" if direction == ASCENDING else "$lt"
+    clauses = []
+    for i, field in enumerate(fields):
+        prefix = {fields[j]: values[j] for j in range(i)}
+        clauses.append({**prefix, field: {op: values[i]}})
+        # Comparisons never cross BSON types and strings sort before dates, so
+        # unmigrated string dates must be matched explicitly on the way past them
+        if field in DATE_FIELD_NAMES:
+            if direction == DESCENDING and isinstance(values[i], datetime):
+                clauses.append({**prefix, field: {"$type": "string"}})
+            elif direction == ASCENDING and isinstance(values[i], str):
+                clauses.append({**prefix, field: {"$type": "date"}})
+    return {"$or": clauses}
+
+def next_page(rows: List[dict], limit: int, fields: List[str]) -> Optional[str]:
+    """Trim the look-ahead row fetched past limit and return the cursor for the next page"""
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor([rows[-1].get(field) for field in fields])
+
+# Catalog listings page newest first on (created_at, id)
+CATALOG_SORT = ["created_at", "id"]
+
+async def find_page(collection, query: dict, projection: dict, cursor: Optional[str], limit: int,
+                    response: Optional[Response] = None) -> List[dict]:
+    """One keyset page of a catalog collection, next cursor goes into X-Next-Cursor"""
+    if cursor:
+        after = keyset_filter(CATALOG_SORT, decode_cursor(cursor, len(CATALOG_SORT)), DESCENDING)
+        query = {"$and": [query, after]} if query else after
+    rows = await collection.find(query, projection).sort(
+        [(field, DESCENDING) for field in CATALOG_SORT]
+    ).limit(limit + 1).to_list(limit + 1)
+    next_cursor = next_page(rows, limit, CATALOG_SORT)
+    if next_cursor and response:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+# Conditional-GET cache for the public catalog routes
+# (namespace, variant) -> (body, strong ETag, extra headers)
+catalog_cache = TTLCache(
+    maxsize=int(os.environ.get('CATALOG_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('CATALOG_CACHE_TTL', '300'))
+)
+catalog_counters = {"not_modified": 0}
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+async def cached_catalog(request: Request, namespace: str, variant: str, loader) -> Response:
+    """Serve a catalog body from cache, or build it with loader(response) and cache it"""
+    entry = catalog_cache.get((namespace, variant))
+    if entry is None:
+        scratch = Response()
+        data = await loader(scratch)
+        body = json.dumps(data, default=json_default).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers = {"X-Next-Cursor": scratch.headers["X-Next-Cursor"]} if "X-Next-Cursor" in scratch.headers else {}
+        entry = (body, etag, headers)
+        catalog_cache.set((namespace, variant), entry)
+    
+    body, etag, headers = entry
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        catalog_counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def query_variant(request: Request) -> str:
+    # Parameter order must not split the cache
+    return "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+def invalidate_catalog(namespace: str, variant: Optional[str] = None):
+    if variant is None:
+        catalog_cache.evict_where(lambda key, entry: key[0] == namespace)
+    else:
+        catalog_cache.pop((namespace, variant))
+
+# Sessions
+SESSION_TTL = timedelta(hours=float(os.environ.get('SESSION_TTL_HOURS', '168')))
+# Sliding sessions are pushed back to a full SESSION_TTL at most once per renew interval
+SESSION_SLIDING = os.environ.get('SESSION_SLIDING', 'false').lower() == 'true'
+SESSION_RENEW_INTERVAL = timedelta(seconds=float(os.environ.get('SESSION_RENEW_INTERVAL', '3600')))
+MAX_SESSIONS_PER_USER = int(os.environ.get('MAX_SESSIONS_PER_USER', '10'))
+SESSION_PURGE_INTERVAL = float(os.environ.get('SESSION_PURGE_INTERVAL', '300'))
+
+session_purge_stats = {
+    "runs": 0,
+    "purged": 0,
+    "last_run_at": None,
+    "last_purged": 0,
+    "last_duration_ms": 0.0
+}
+
+def set_session_cookie(response: Response, session_token: str, expires_at: datetime):
+    response.set_cookie(
+        key="session_token",
+        value=session_token,
+        httponly=True,
+        secure=True,
+        samesite="none",
+        max_age=max(int((expires_at - datetime.now(timezone.utc)).total_seconds()), 0),
+        path="/"
+    )
+
+async def renew_session(session_token: str, user: User, expires_at: datetime, request: Optional[Request]) -> datetime:
+    """Extend a sliding session once it is older than the renew interval"""
+    now = datetime.now(timezone.utc)
+    if not SESSION_SLIDING or expires_at - now > SESSION_TTL - SESSION_RENEW_INTERVAL:
+        return expires_at
+    
+    expires_at = now + SESSION_TTL
+    await db.user_sessions.update_one({"session_token": session_token}, {"$set": {"expires_at": expires_at}})
+    session_cache.set(session_token, (user, expires_at), ttl=SESSION_TTL.total_seconds())
+    if request:
+        # SessionCookieMiddleware sends the new expiry back to the browser
+        request.state.renewed_session = (session_token, expires_at)
+    return expires_at
+
+class SessionCookieMiddleware:
+    """ASGI middleware adding the cookie of a session renewed during the request to its response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # request.state is backed by this dict, so renew_session's writes land here
+        state = scope.setdefault("state", {})
+        
+        async def send_with_cookie(message):
+            renewed = state.get("renewed_session")
+            # A route that sets or deletes the cookie itself (login, logout) has the last word
+            if message["type"] == "http.response.start" and renewed and not any(
+                name == b"set-cookie" and value.startswith(b"session_token=")
+                for name, value in message.get("headers", [])
+            ):
+                cookie = Response()
+                set_session_cookie(cookie, *renewed)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *((name, value) for name, value in cookie.raw_headers if name == b"set-cookie")
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cookie)
+
+async def enforce_session_cap(user_id: str):
+    """Drop the oldest sessions of a user beyond MAX_SESSIONS_PER_USER"""
+    if MAX_SESSIONS_PER_USER <= 0:
+        return
+    stale = await db.user_sessions.find(
+        {"user_id": user_id}, {"_id": 0, "session_token": 1}
+    ).sort("created_at", -1).skip(MAX_SESSIONS_PER_USER).to_list(None)
+    if not stale:
+        return
+    tokens = [session["session_token"] for session in stale]
+    await db.user_sessions.delete_many({"session_token": {"$in": tokens}})
+    for token in tokens:
+        session_cache.pop(token)
+
+async def purge_expired_sessions(batch_size: int = 1000) -> int:
+    """Delete expired sessions the TTL monitor cannot see, e.g. legacy string expiries"""
+    started = time.perf_counter()
+    purged = 0
+    expired = date_range("expires_at", lte=datetime.now(timezone.utc))
+    while True:
+        batch = await db.user_sessions.find(expired, {"_id": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        result = await db.user_sessions.delete_many({"_id": {"$in": [session["_id"] for session in batch]}})
+        purged += result.deleted_count
+        if len(batch) < batch_size:
+            break
+    
+    session_purge_stats["runs"] += 1
+    session_purge_stats["purged"] += purged
+    session_purge_stats["last_run_at"] = datetime.now(timezone.utc)
+    session_purge_stats["last_purged"] = purged
+    session_purge_stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return purged
+
+async def purge_sessions_periodically():
+    while True:
+        await asyncio.sleep(SESSION_PURGE_INTERVAL)
+        try:
+            await purge_expired_sessions()
+        except Exception:
+            logger.exception("Session purge failed")
+
+# Upstream auth client
+AUTH_SESSION_URL = os.environ.get('AUTH_SESSION_URL', 'https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data')
+AUTH_TIMEOUT = float(os.environ.get('AUTH_TIMEOUT', '5'))
+AUTH_CONNECT_TIMEOUT = float(os.environ.get('AUTH_CONNECT_TIMEOUT', '2'))
+AUTH_RETRIES = int(os.environ.get('AUTH_RETRIES', '2'))
+AUTH_RETRY_BACKOFF = float(os.environ.get('AUTH_RETRY_BACKOFF', '0.2'))
+AUTH_MAX_CONCURRENCY = int(os.environ.get('AUTH_MAX_CONCURRENCY', '50'))
+
+auth_client: Optional[httpx.AsyncClient] = None
+auth_semaphore = asyncio.Semaphore(AUTH_MAX_CONCURRENCY)
+auth_upstream_latency = LatencyHistogram()
+auth_upstream_stats = {"requests": 0, "errors": 0, "retries": 0}
+
+def get_auth_client() -> httpx.AsyncClient:
+    """The shared keep-alive client, opened on startup or on first use"""
+    global auth_client
+    if auth_client is None or auth_client.is_closed:
+        auth_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(AUTH_TIMEOUT, connect=AUTH_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=AUTH_MAX_CONCURRENCY,
+                max_keepalive_connections=AUTH_MAX_CONCURRENCY,
+                keepalive_expiry=30
+            )
+        )
+    return auth_client
+
+async def fetch_session_data(session_id: str) -> dict:
+    """Resolve an OAuth session id upstream, retrying transport errors and 5xx with jitter"""
+    last_error = None
+    for attempt in range(AUTH_RETRIES + 1):
+        if attempt:
+            auth_upstream_stats["retries"] += 1
+            # Full jitter keeps a login storm from retrying in lockstep
+            await asyncio.sleep(random.uniform(0, AUTH_RETRY_BACKOFF * 2 ** (attempt - 1)))
+        
+        async with auth_semaphore:
+            auth_upstream_stats["requests"] += 1
+            started = time.perf_counter()
+            try:
+                response = await get_auth_client().get(AUTH_SESSION_URL, headers={"X-Session-ID": session_id})
+                if response.status_code < 500:
+                    # A 4xx will not get better on retry
+                    response.raise_for_status()
+                    return response.json()
+                last_error = httpx.HTTPStatusError(
+                    f"Auth upstream returned {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                last_error = e
+            except httpx.HTTPStatusError:
+                auth_upstream_stats["errors"] += 1
+                raise
+            finally:
+                auth_upstream_latency.observe(time.perf_counter() - started)
+        auth_upstream_stats["errors"] += 1
+    raise last_error
+
+# Stats counters
+# One document maintained with $inc by the write routes so GET /admin/stats reads a
+# single small document. reconcile_stats() recomputes it to correct any drift.
+STATS_ID = "admin"
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', '600'))
+stats_reconcile_info = {"runs": 0, "last_run_at": None, "last_drift": {}}
+
+async def bump_stats(students: int = 0, drives: int = 0, applications: int = 0, statuses: Optional[dict] = None):
+    increments = {}
+    if students:
+        increments["total_students"] = students
+    if drives:
+        increments["total_drives"] = drives
+    if applications:
+        increments["total_applications"] = applications
+    for status, delta in (statuses or {}).items():
+        # Arbitrary strings must not become field paths; reconcile_stats() counts those
+        if status in STATUS_TRANSITIONS and delta:
+            increments[f"status.{status}"] = delta
+    if increments:
+        await db.stats.update_one({"_id": STATS_ID}, {"$inc": increments}, upsert=True)
+
+def stats_pipeline() -> List[dict]:
+    """Students, drives, applications and applications per status, counted in one $facet"""
+    return [
+        {"$project": {"_id": 0, "kind": {"$literal": "application"}, "status": 1}},
+        {"$unionWith": {"coll": "users", "pipeline": [
+            {"$match": {"role": "student"}},
+            {"$project": {"_id": 0, "kind": {"$literal": "student"}}}
+        ]}},
+        {"$unionWith": {"coll": "placement_drives", "pipeline": [
+            {"$project": {"_id": 0, "kind": {"$literal": "drive"}}}
+        ]}},
+        {"$facet": {
+            "kinds": [{"$group": {"_id": "$kind", "count": {"$sum": 1}}}],
+            "statuses": [
+                {"$match": {"kind": "application"}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]
+        }}
+    ]
+
+async def compute_stats() -> dict:
+    """Count everything from scratch in a single $facet pipeline"""
+    result = (await db.applications.aggregate(stats_pipeline()).to_list(1))[0]
+    kinds = {row["_id"]: row["count"] for row in result["kinds"]}
+    return {
+        "total_students": kinds.get("student", 0),
+        "total_drives": kinds.get("drive", 0),
+        "total_applications": kinds.get("application", 0),
+        "status": {row["_id"]: row["count"] for row in result["statuses"] if row["_id"] is not None}
+    }
+
+async def reconcile_stats() -> dict:
+    """Overwrite the counters with a fresh count and record how far they had drifted"""
+    fresh = await compute_stats()
+    current = await db.stats.find_one({"_id": STATS_ID}) or {}
+    drift = {}
+    for field in ("total_students", "total_drives", "total_applications"):
+        if current.get(field, 0) != fresh[field]:
+            drift[field] = fresh[field] - current.get(field, 0)
+    for status in set(fresh["status"]) | set(current.get("status", {})):
+        delta = fresh["status"].get(status, 0) - current.get("status", {}).get(status, 0)
+        if delta:
+            drift[f"status.{status}"] = delta
     
+    await db.stats.replace_one(
+        {"_id": STATS_ID},
+        {**fresh, "reconciled_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+    stats_reconcile_info["runs"] += 1
+    stats_reconcile_info["last_run_at"] = datetime.now(timezone.utc)
+    stats_reconcile_info["last_drift"] = drift
+    if drift:
+        logger.warning("Admin stats drifted, corrected: %s", drift)
+    return fresh
+
+async def reconcile_stats_periodically():
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL)
+        try:
+            await reconcile_stats()
+        except Exception:
+            logger.exception("Stats reconciliation failed")
+
+# Auth Helper
+def get_session_token(authorization: Optional[str], request: Optional[Request]) -> Optional[str]:
     # Try to get token from cookie first
     if request and request.cookies.get("session_token"):
-        session_token = request.cookies.get("session_token")
+        return request.cookies.get("session_token")
     # Fallback to Authorization header
-    elif authorization and authorization.startswith("Bearer "):
-        session_token = authorization.replace("Bearer ", "")
+    if authorization and authorization.startswith("Bearer "):
+        return authorization.replace("Bearer ", "")
+    return None
+
+async def get_current_user(authorization: Optional[str] = Header(None), request: Request = None) -> User:
+    session_token = get_session_token(authorization, request)
     
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
+    cached = session_cache.get(session_token)
+    if cached:
+        user, expires_at = cached
+        if expires_at < datetime.now(timezone.utc):
+            session_cache.pop(session_token)
+            raise HTTPException(status_code=401, detail="Session expired")
+        await renew_session(session_token, user, expires_at, request)
+        return user
+    
     # Check session in database
     session = await db.user_sessions.find_one({"session_token": session_token})
     if not session:
         raise HTTPException(status_code=401, detail="Invalid session")
     
     # Check if session expired
-    if isinstance(session["expires_at"], str):
-        expires_at = datetime.fromisoformat(session["expires_at"])
-    else:
-        expires_at = session["expires_at"]
+    expires_at = as_datetime(session["expires_at"])
     
     if expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail="Session expired")
@@ -193,7 +1020,11 @@ async def get_current_user(authorization: Optional[str] = Header(None), request:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return User(**user)
+    user = User(**user)
+    remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+    session_cache.set(session_token, (user, expires_at), ttl=remaining)
+    await renew_session(session_token, user, expires_at, request)
+    return user
 
 # Admin authorization helper
 async def get_admin_user(authorization: Optional[str] = Header(None), request: Request = None) -> User:
@@ -210,16 +1041,10 @@ async def create_session(session_id: str = Header(None, alias="X-Session-ID"), r
         raise HTTPException(status_code=400, detail="Session ID required")
     
     # Get session data from Emergent Auth
-    async with httpx.AsyncClient() as client:
-        try:
-            auth_response = await client.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-                headers={"X-Session-ID": session_id}
-            )
-            auth_response.raise_for_status()
-            session_data = auth_response.json()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to get session data: {str(e)}")
+    try:
+        session_data = await fetch_session_data(session_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to get session data: {str(e)}")
     
     # Create or update user
     user_data = {
@@ -228,42 +1053,57 @@ async def create_session(session_id: str = Header(None, alias="X-Session-ID"), r
         "name": session_data["name"],
         "picture": session_data.get("picture"),
         "role": "student",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     
-    existing_user = await db.users.find_one({"email": session_data["email"]})
-    if not existing_user:
-        await db.users.insert_one(user_data)
+    # Upserts keep a retried or concurrent first login from tripping the unique indexes
+    try:
+        result = await db.users.update_one({"email": session_data["email"]}, {"$setOnInsert": user_data}, upsert=True)
+        user_created = result.upserted_id is not None
+    except DuplicateKeyError:
+        user_created = False
+    if user_created:
+        await bump_stats(students=1)
         # Create student profile
         profile_data = {
             "id": str(uuid.uuid4()),
             "user_id": session_data["id"],
             "skills": [],
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }
-        await db.student_profiles.insert_one(profile_data)
+        try:
+            result = await db.student_profiles.update_one(
+                {"user_id": session_data["id"]}, {"$setOnInsert": profile_data}, upsert=True
+            )
+            profile_created = result.upserted_id is not None
+        except DuplicateKeyError:
+            profile_created = False
+        if profile_created and eligibility_index.built_at:
+            eligibility_index.upsert(profile_data)
     
     # Store session
     session_token = session_data["session_token"]
     session_doc = {
         "user_id": session_data["id"],
         "session_token": session_token,
-        "expires_at": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "expires_at": datetime.now(timezone.utc) + SESSION_TTL,
+        "created_at": datetime.now(timezone.utc)
     }
-    await db.user_sessions.insert_one(session_doc)
+    # A retried login gets the same upstream token back; renew that session instead of a duplicate insert
+    await db.user_sessions.update_one(
+        {"session_token": session_token},
+        {
+            "$set": {"expires_at": session_doc["expires_at"]},
+            "$setOnInsert": {"user_id": session_doc["user_id"], "created_at": session_doc["created_at"]}
+        },
+        upsert=True
+    )
+    session_cache.pop(session_token)
+    await enforce_session_cap(session_data["id"])
     
     # Set cookie
     if response:
-        response.set_cookie(
-            key="session_token",
-            value=session_token,
-            httponly=True,
-            secure=True,
-            samesite="none",
-            max_age=7 * 24 * 60 * 60,
-            path="/"
-        )
+        set_session_cookie(response, session_token, session_doc["expires_at"])
     
     return {"user": user_data, "session_token": session_token}
 
@@ -277,13 +1117,10 @@ async def logout(authorization: Optional[str] = Header(None), request: Request =
     user = await get_current_user(authorization, request)
     
     # Delete session
-    session_token = None
-    if request and request.cookies.get("session_token"):
-        session_token = request.cookies.get("session_token")
-    elif authorization and authorization.startswith("Bearer "):
-        session_token = authorization.replace("Bearer ", "")
+    session_token = get_session_token(authorization, request)
     
     if session_token:
+        session_cache.pop(session_token)
         await db.user_sessions.delete_one({"session_token": session_token})
     
     # Clear cookie
@@ -304,7 +1141,7 @@ async def update_profile(profile_update: ProfileUpdateRequest, authorization: Op
     user = await get_current_user(authorization, request)
     
     update_data = profile_update.model_dump(exclude_none=True)
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
     await db.student_profiles.update_one(
         {"user_id": user.id},
@@ -312,38 +1149,418 @@ async def update_profile(profile_update: ProfileUpdateRequest, authorization: Op
     )
     
     profile = await db.student_profiles.find_one({"user_id": user.id}, {"_id": 0})
+    if profile and eligibility_index.built_at:
+        eligibility_index.upsert(profile)
     return profile
 
+# Eligibility
+# Free-text eligibility is parsed into rules when a drive is written, and every
+# student profile is kept in memory as parallel arrays (CGPA, graduation year,
+# degree code) plus an int skill bitset, so ranking a drive is one pass over them.
+ELIGIBILITY_REBUILD_INTERVAL = float(os.environ.get('ELIGIBILITY_REBUILD_INTERVAL', '900'))
+
+CGPA_RULE = re.compile(r"(?:cgpa|gpa)\D{0,12}?(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\s*\+?\s*(?:cgpa|gpa)", re.IGNORECASE)
+YEAR_RULE = re.compile(r"\b(20\d{2})\b")
+# B.E./M.E. need their dots, "be" and "me" are ordinary words
+DEGREE_RULE = re.compile(r"\b(b\.?\s?tech|m\.?\s?tech|b\.\s?e\b|m\.\s?e\b|b\.?\s?sc|m\.?\s?sc|bca|mca|mba)\b", re.IGNORECASE)
+
+def normalize_degree(degree: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]", "", (degree or "").lower())
+
+def degree_words(degree: Optional[str]) -> str:
+    """Lowercase words of a profile degree with dots dropped: "B. Tech (CS)" becomes b tech cs"""
+    return " ".join(re.findall(r"[a-z0-9]+", (degree or "").lower().replace(".", "")))
+
+def degree_prefixes(words: str) -> set:
+    """Prefixes ending on a word boundary, so rule "me" matches M.E. Civil but not Mechanical"""
+    prefixes, prefix = set(), ""
+    for word in words.split():
+        prefix += word
+        prefixes.add(prefix)
+    return prefixes
+
+def parse_eligibility(text: Optional[str]) -> dict:
+    """Structured rules from text like "CGPA >= 7.5, B.Tech/MCA, 2025 batch"; absent rules are None"""
+    text = text or ""
+    cgpa = CGPA_RULE.search(text)
+    years = sorted({int(year) for year in YEAR_RULE.findall(text)})
+    degrees = sorted({normalize_degree(degree) for degree in DEGREE_RULE.findall(text)})
+    return {
+        "min_cgpa": float(cgpa.group(1) or cgpa.group(2)) if cgpa else None,
+        "degrees": degrees or None,
+        "graduation_years": years or None
+    }
+
+class EligibilityIndex:
+    """Student profiles as compact parallel arrays, one row per student"""
+
+    def __init__(self):
+        self.clear()
+        self.built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def clear(self):
+        self.rows = {}  # user_id -> row
+        self.user_ids = []
+        self.cgpa = array("d")  # -1.0 when unknown
+        self.years = array("H")  # 0 when unknown
+        self.degrees = array("H")  # code into degree_names, 0 when unknown
+        self.skills = []  # int bitset over skill_names, only skills some drive asks for
+        self.degree_names = [""]
+        self.degree_codes = {"": 0}
+        self.skill_names = []
+        self.skill_bits = {}
+
+    def skill_mask(self, skills, grow: bool = True) -> int:
+        mask = 0
+        for skill in skills or []:
+            key = skill.strip().lower()
+            bit = self.skill_bits.get(key)
+            if bit is None:
+                if not grow:
+                    continue
+                bit = self.skill_bits[key] = len(self.skill_names)
+                self.skill_names.append(skill.strip())
+            mask |= 1 << bit
+        return mask
+
+    def upsert(self, profile: dict):
+        """Add or refresh one student's row, e.g. after update_profile"""
+        degree = degree_words(profile.get("degree"))
+        code = self.degree_codes.get(degree)
+        if code is None:
+            code = self.degree_codes[degree] = len(self.degree_names)
+            self.degree_names.append(degree)
+        cgpa = profile.get("cgpa")
+        year = int(profile.get("graduation_year") or 0)
+        values = (
+            float(cgpa) if cgpa is not None else -1.0,
+            # Anything the unsigned short cannot hold is as good as unknown
+            year if 0 < year <= 65535 else 0,
+            code,
+            # Free-text skills nobody asks for would only widen every bitset
+            self.skill_mask(profile.get("skills"), grow=False)
+        )
+        row = self.rows.get(profile["user_id"])
+        if row is None:
+            self.rows[profile["user_id"]] = len(self.user_ids)
+            self.user_ids.append(profile["user_id"])
+            self.cgpa.append(values[0])
+            self.years.append(values[1])
+            self.degrees.append(values[2])
+            self.skills.append(values[3])
+        else:
+            self.cgpa[row], self.years[row], self.degrees[row], self.skills[row] = values
+
+    async def build(self):
+        started = time.perf_counter()
+        skills_required = await db.placement_drives.distinct("skills_required")
+        self.clear()
+        self.skill_mask(skills_required)
+        projection = {"_id": 0, "user_id": 1, "cgpa": 1, "degree": 1, "graduation_year": 1, "skills": 1}
+        async for profile in db.student_profiles.find({}, projection).batch_size(5000):
+            self.upsert(profile)
+        self.built_at = time.monotonic()
+        logger.info("Eligibility index built: %d profiles, %d skills in %.2fs",
+                    len(self.user_ids), len(self.skill_names), time.perf_counter() - started)
+
+    def is_stale(self, skills_required: Optional[List[str]] = None) -> bool:
+        if not self.built_at or time.monotonic() - self.built_at > ELIGIBILITY_REBUILD_INTERVAL:
+            return True
+        # A skill no drive asked for at build time has no bit in any row yet
+        return any(skill.strip().lower() not in self.skill_bits for skill in skills_required or ())
+
+    async def ensure_fresh(self, skills_required: Optional[List[str]] = None):
+        # Profiles written by other workers are picked up by the periodic rebuild
+        if self.is_stale(skills_required):
+            async with self._lock:
+                if self.is_stale(skills_required):
+                    await self.build()
+
+    def rule_checks(self, rules: dict) -> List[tuple]:
+        """(rule name, row predicate) for each rule the drive sets; rank() and describe() share them"""
+        checks = []
+        if rules.get("min_cgpa") is not None:
+            # Unknown CGPA is stored as -1.0 and fails any floor
+            min_cgpa, cgpa = rules["min_cgpa"], self.cgpa
+            checks.append(("cgpa", lambda i: cgpa[i] >= min_cgpa))
+        if rules.get("graduation_years"):
+            years, grad_years = set(rules["graduation_years"]), self.years
+            checks.append(("graduation_year", lambda i: grad_years[i] in years))
+        if rules.get("degrees"):
+            wanted = set(rules["degrees"])
+            allowed = {code for name, code in self.degree_codes.items() if degree_prefixes(name) & wanted}
+            degrees = self.degrees
+            checks.append(("degree", lambda i: degrees[i] in allowed))
+        return checks
+
+    def rank(self, rules: dict, skills_required: List[str], user_ids: Optional[List[str]] = None,
+             eligible_only: bool = False, limit: int = 100) -> tuple:
+        """(evaluated, eligible, top rows) ranked by eligibility, skills matched, then CGPA"""
+        rows = range(len(self.user_ids)) if user_ids is None else [self.rows[u] for u in user_ids if u in self.rows]
+        required = self.skill_mask(skills_required, grow=False)
+        predicates = [check for _, check in self.rule_checks(rules)]
+        
+        cgpa, skills = self.cgpa, self.skills
+        keys = [
+            (
+                all(check(i) for check in predicates),
+                (skills[i] & required).bit_count(),
+                cgpa[i],
+                i
+            )
+            for i in rows
+        ]
+        eligible = sum(1 for key in keys if key[0])
+        if eligible_only:
+            keys = [key for key in keys if key[0]]
+        return len(rows), eligible, heapq.nlargest(limit, keys)
+
+    def describe(self, key: tuple, rules: dict, skills_required: List[str]) -> dict:
+        _, matched, cgpa, i = key
+        failed = [name for name, check in self.rule_checks(rules) if not check(i)]
+        matched_skills = []
+        for skill in skills_required:
+            bit = self.skill_bits.get(skill.strip().lower())
+            if bit is not None and self.skills[i] >> bit & 1:
+                matched_skills.append(skill)
+        return {
+            "user_id": self.user_ids[i],
+            "eligible": not failed,
+            "failed": failed,
+            "cgpa": cgpa if cgpa >= 0 else None,
+            "graduation_year": self.years[i] or None,
+            "matched_skills": matched_skills,
+            "skill_match": round(matched / len(skills_required), 4) if skills_required else 1.0
+        }
+
+eligibility_index = EligibilityIndex()
+
+@api_router.get("/admin/drives/{drive_id}/eligibility")
+async def rank_drive_candidates(
+    drive_id: str,
+    scope: str = Query("applicants", pattern="^(applicants|students)$"),
+    eligible_only: bool = False,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    authorization: Optional[str] = Header(None),
+    request: Request = None
+):
+    """Rank a drive's applicants, or every student, against its eligibility rules and skills"""
+    await get_admin_user(authorization, request)
+    
+    drive = await db.placement_drives.find_one(
+        {"id": drive_id}, {"_id": 0, "eligibility": 1, "eligibility_rules": 1, "skills_required": 1}
+    )
+    if not drive:
+        raise HTTPException(status_code=404, detail="Drive not found")
+    rules = drive.get("eligibility_rules") or parse_eligibility(drive.get("eligibility"))
+    skills_required = drive.get("skills_required") or []
+    
+    user_ids = None
+    if scope == "applicants":
+        user_ids = await db.applications.distinct("user_id", {"drive_id": drive_id})
+    
+    await eligibility_index.ensure_fresh(skills_required)
+    started = time.perf_counter()
+    evaluated, eligible, top = eligibility_index.rank(rules, skills_required, user_ids, eligible_only, limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    results = [eligibility_index.describe(key, rules, skills_required) for key in top]
+    users = {}
+    async for user in db.users.find({"id": {"$in": [r["user_id"] for r in results]}}, {"_id": 0, "id": 1, "name": 1, "email": 1}):
+        users[user["id"]] = user
+    for result in results:
+        user = users.get(result["user_id"], {})
+        result["name"] = user.get("name")
+        result["email"] = user.get("email")
+    
+    return {
+        "drive_id": drive_id,
+        "rules": rules,
+        "skills_required": skills_required,
+        "scope": scope,
+        "evaluated": evaluated,
+        "eligible": eligible,
+        "rank_ms": round(elapsed_ms, 2),
+        "results": results
+    }
+
 # Placement Drives Routes
+# Drive id -> the fields apply_to_drive validates against
+drive_state_cache = TTLCache(
+    maxsize=int(os.environ.get('DRIVE_STATE_CACHE_SIZE', '4096')),
+    ttl=float(os.environ.get('DRIVE_STATE_CACHE_TTL', '30'))
+)
+
+async def get_drive_state(drive_id: str) -> Optional[dict]:
+    state = drive_state_cache.get(drive_id)
+    if state is None:
+        state = await db.placement_drives.find_one(
+            {"id": drive_id}, {"_id": 0, "status": 1, "application_deadline": 1}
+        )
+        if state is None:
+            return None
+        state["application_deadline"] = as_datetime(state.get("application_deadline"))
+        drive_state_cache.set(drive_id, state)
+    return state
+
+def invalidate_drive(drive_id: Optional[str] = None):
+    """Forget everything cached for a drive after it is created, changed or deleted"""
+    invalidate_catalog("drives")
+    if drive_id:
+        invalidate_catalog("drive", drive_id)
+        drive_state_cache.pop(drive_id)
+
+def drives_query(company: Optional[str] = None, location: Optional[str] = None,
+                 deadline_from: Optional[datetime] = None, deadline_to: Optional[datetime] = None) -> dict:
+    """Filter for active drives; company and location match by prefix so the indexes apply"""
+    query = {"status": "active"}
+    if company:
+        query["company_name"] = {"$regex": f"^{re.escape(company)}"}
+    if location:
+        query["location"] = {"$regex": f"^{re.escape(location)}"}
+    if deadline_from or deadline_to:
+        query.update(date_range("application_deadline", deadline_from, deadline_to))
+    return query
+
 @api_router.get("/drives")
-async def get_drives():
-    drives = await db.placement_drives.find({"status": "active"}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for drive in drives:
-        if isinstance(drive.get("application_deadline"), str):
-            drive["application_deadline"] = datetime.fromisoformat(drive["application_deadline"]).isoformat()
-        if drive.get("interview_date") and isinstance(drive["interview_date"], str):
-            drive["interview_date"] = datetime.fromisoformat(drive["interview_date"]).isoformat()
-    return drives
+async def get_drives(
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    request: Request = None
+):
+    async def load(response: Response):
+        query = drives_query(company, location, deadline_from, deadline_to)
+        return await find_page(db.placement_drives, query, {"_id": 0}, cursor, limit, response)
+    
+    return await cached_catalog(request, "drives", query_variant(request), load)
+
+CTC_AMOUNT = re.compile(r"\d+(?:\.\d+)?")
+
+def parse_ctc(ctc: Optional[str]) -> tuple:
+    """(min, max) in LPA from strings like "₹25-30 LPA", "₹1.2 Cr" or "₹50,000/month", (None, None) if unreadable"""
+    if not ctc:
+        return None, None
+    amounts = [float(amount) for amount in CTC_AMOUNT.findall(ctc.replace(",", ""))[:2]]
+    if not amounts:
+        return None, None
+    unit = ctc.lower()
+    if re.search(r"\bcr", unit):
+        amounts = [amount * 100 for amount in amounts]
+    elif "month" in unit:
+        amounts = [round(amount * 12 / 100000, 2) for amount in amounts]
+    return min(amounts), max(amounts)
+
+async def backfill_drive_fields() -> int:
+    """Parse ctc and eligibility on drives written before the parsed fields existed"""
+    operations = []
+    pending = {"$or": [{"ctc_min": {"$exists": False}}, {"eligibility_rules": {"$exists": False}}]}
+    async for drive in db.placement_drives.find(pending, {"_id": 1, "ctc": 1, "eligibility": 1}):
+        ctc_min, ctc_max = parse_ctc(drive.get("ctc"))
+        operations.append(UpdateOne({"_id": drive["_id"]}, {"$set": {
+            "ctc_min": ctc_min,
+            "ctc_max": ctc_max,
+            "eligibility_rules": parse_eligibility(drive.get("eligibility"))
+        }}))
+    if operations:
+        await db.placement_drives.bulk_write(operations, ordered=False)
+        invalidate_drive()
+    return len(operations)
+
+# Search results page on (score, id); without a text query every score is 0
+SEARCH_SORT = ["score", "id"]
+
+def drive_search_pipeline(q: Optional[str] = None, skills: Optional[List[str]] = None, location: Optional[str] = None,
+                          ctc_min: Optional[float] = None, ctc_max: Optional[float] = None,
+                          after: Optional[list] = None, limit: int = 100) -> List[dict]:
+    """Active drives matching the filters, best text match first, newest first otherwise"""
+    match = {"status": "active"}
+    if q:
+        match["$text"] = {"$search": q}
+    if skills:
+        match["skills_required"] = {"$all": skills}
+    if location:
+        match["location"] = {"$regex": f"^{re.escape(location)}"}
+    # Overlap with the requested band: the drive's top reaches ctc_min, its floor stays under ctc_max
+    if ctc_min is not None:
+        match["ctc_max"] = {"$gte": ctc_min}
+    if ctc_max is not None:
+        match["ctc_min"] = {"$lte": ctc_max}
+    
+    if not q:
+        sort = [(field, DESCENDING) for field in CATALOG_SORT]
+        if after:
+            match = {"$and": [match, keyset_filter(CATALOG_SORT, after, DESCENDING)]}
+        return [{"$match": match}, {"$sort": dict(sort)}, {"$limit": limit}, {"$project": {"_id": 0}}]
+    
+    pipeline = [
+        {"$match": match},
+        {"$set": {"score": {"$meta": "textScore"}}}
+    ]
+    if after:
+        pipeline.append({"$match": keyset_filter(SEARCH_SORT, after, DESCENDING)})
+    pipeline += [
+        {"$sort": {"score": -1, "id": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0}}
+    ]
+    return pipeline
+
+@api_router.get("/drives/search")
+async def search_drives(
+    q: Optional[str] = None,
+    skills: Optional[List[str]] = Query(None),
+    location: Optional[str] = None,
+    ctc_min: Optional[float] = Query(None, ge=0),
+    ctc_max: Optional[float] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    request: Request = None
+):
+    q = (q or "").strip() or None
+    sort = SEARCH_SORT if q else CATALOG_SORT
+    after = decode_cursor(cursor, len(sort)) if cursor else None
+    
+    async def load(response: Response):
+        pipeline = drive_search_pipeline(q, skills, location, ctc_min, ctc_max, after, limit + 1)
+        rows = await db.placement_drives.aggregate(pipeline).to_list(limit + 1)
+        next_cursor = next_page(rows, limit, sort)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return rows
+    
+    # Same namespace as the listing so invalidate_drive() clears searches too
+    return await cached_catalog(request, "drives", "search?" + query_variant(request), load)
 
 @api_router.get("/drives/{drive_id}")
-async def get_drive(drive_id: str):
-    drive = await db.placement_drives.find_one({"id": drive_id}, {"_id": 0})
-    if not drive:
-        raise HTTPException(status_code=404, detail="Drive not found")
-    return drive
+async def get_drive(drive_id: str, request: Request = None):
+    async def load(response: Response):
+        drive = await db.placement_drives.find_one({"id": drive_id}, {"_id": 0})
+        if not drive:
+            raise HTTPException(status_code=404, detail="Drive not found")
+        return drive
+    
+    return await cached_catalog(request, "drive", drive_id, load)
 
 @api_router.post("/drives")
 async def create_drive(drive_data: DriveCreateRequest, authorization: Optional[str] = Header(None), request: Request = None):
     await get_admin_user(authorization, request)
     
     drive = PlacementDrive(**drive_data.model_dump())
+    drive.application_deadline = as_utc(drive.application_deadline)
+    drive.ctc_min, drive.ctc_max = parse_ctc(drive.ctc)
+    drive.eligibility_rules = parse_eligibility(drive.eligibility)
+    if drive.interview_date:
+        drive.interview_date = as_utc(drive.interview_date)
     drive_dict = drive.model_dump()
-    drive_dict["created_at"] = drive_dict["created_at"].isoformat()
-    drive_dict["application_deadline"] = drive_dict["application_deadline"].isoformat()
-    if drive_dict.get("interview_date"):
-        drive_dict["interview_date"] = drive_dict["interview_date"].isoformat()
     
     await db.placement_drives.insert_one(drive_dict)
+    await bump_stats(drives=1)
+    invalidate_drive()
     return drive
 
 @api_router.put("/drives/{drive_id}")
@@ -351,9 +1568,11 @@ async def update_drive(drive_id: str, drive_data: DriveCreateRequest, authorizat
     await get_admin_user(authorization, request)
     
     update_data = drive_data.model_dump()
-    update_data["application_deadline"] = update_data["application_deadline"].isoformat()
+    update_data["application_deadline"] = as_utc(update_data["application_deadline"])
     if update_data.get("interview_date"):
-        update_data["interview_date"] = update_data["interview_date"].isoformat()
+        update_data["interview_date"] = as_utc(update_data["interview_date"])
+    update_data["ctc_min"], update_data["ctc_max"] = parse_ctc(update_data["ctc"])
+    update_data["eligibility_rules"] = parse_eligibility(update_data["eligibility"])
     
     result = await db.placement_drives.update_one(
         {"id": drive_id},
@@ -363,6 +1582,7 @@ async def update_drive(drive_id: str, drive_data: DriveCreateRequest, authorizat
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Drive not found")
     
+    invalidate_drive(drive_id)
     return {"message": "Drive updated successfully"}
 
 @api_router.delete("/drives/{drive_id}")
@@ -373,6 +1593,8 @@ async def delete_drive(drive_id: str, authorization: Optional[str] = Header(None
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Drive not found")
     
+    await bump_stats(drives=-1)
+    invalidate_drive(drive_id)
     return {"message": "Drive deleted successfully"}
 
 # Application Routes
@@ -380,94 +1602,746 @@ async def delete_drive(drive_id: str, authorization: Optional[str] = Header(None
 async def apply_to_drive(drive_id: str, authorization: Optional[str] = Header(None), request: Request = None):
     user = await get_current_user(authorization, request)
     
-    # Check if already applied
-    existing = await db.applications.find_one({"drive_id": drive_id, "user_id": user.id})
-    if existing:
-        raise HTTPException(status_code=400, detail="Already applied to this drive")
+    drive = await get_drive_state(drive_id)
+    if not drive:
+        raise HTTPException(status_code=404, detail="Drive not found")
+    if drive.get("status") != "active":
+        raise HTTPException(status_code=400, detail="Drive is not accepting applications")
+    if drive.get("application_deadline") and drive["application_deadline"] < datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="Application deadline has passed")
     
     application = Application(drive_id=drive_id, user_id=user.id)
     app_dict = application.model_dump()
-    app_dict["applied_at"] = app_dict["applied_at"].isoformat()
-    app_dict["updated_at"] = app_dict["updated_at"].isoformat()
     
-    await db.applications.insert_one(app_dict)
+    # The unique (drive_id, user_id) index turns a duplicate apply into a failed insert
+    try:
+        await db.applications.insert_one(app_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already applied to this drive")
+    await bump_stats(applications=1, statuses={application.status: 1})
     return application
 
+# Drive fields MyApplications.jsx renders next to each application
+APPLICATION_DRIVE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "company_name": 1,
+    "company_logo": 1,
+    "role": 1,
+    "ctc": 1,
+    "location": 1,
+    "status": 1,
+    "application_deadline": 1,
+    "interview_date": 1
+}
+
+def my_applications_pipeline(user_id: str, limit: int = 100) -> List[dict]:
+    """Newest-first applications of a user joined with their drive in one round trip"""
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$sort": {"applied_at": -1, "id": 1}},
+        {"$limit": limit},
+        {"$lookup": {
+            "from": "placement_drives",
+            "localField": "drive_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": APPLICATION_DRIVE_PROJECTION}],
+            "as": "drive"
+        }},
+        {"$project": {"_id": 0}},
+        {"$set": {"drive": {"$ifNull": [{"$first": "$drive"}, None]}}}
+    ]
+
 @api_router.get("/applications/my")
+@query_budget(4)
 async def get_my_applications(authorization: Optional[str] = Header(None), request: Request = None):
     user = await get_current_user(authorization, request)
-    applications = await db.applications.find({"user_id": user.id}, {"_id": 0}).to_list(100)
+    applications = await db.applications.aggregate(my_applications_pipeline(user.id)).to_list(100)
+    return applications
+
+DRIVE_APPLICATIONS_SORT = ["applied_at", "id"]
+
+def drive_applications_pipeline(drive_id: str, status: Optional[str] = None, min_cgpa: Optional[float] = None,
+                                skills: Optional[List[str]] = None, after: Optional[list] = None,
+                                limit: Optional[int] = None, join_users: bool = True) -> List[dict]:
+    """Applicants of a drive joined with their user and profile documents"""
+    match = {"drive_id": drive_id}
+    if status:
+        match["status"] = status
+    if after:
+        match.update(keyset_filter(DRIVE_APPLICATIONS_SORT, after, ASCENDING))
     
-    # Enrich with drive data
-    for app in applications:
-        drive = await db.placement_drives.find_one({"id": app["drive_id"]}, {"_id": 0})
-        app["drive"] = drive
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"applied_at": 1, "id": 1}},
+        {"$lookup": {
+            "from": "student_profiles",
+            "localField": "user_id",
+            "foreignField": "user_id",
+            "pipeline": [{"$project": {"_id": 0}}],
+            "as": "profile"
+        }},
+        {"$set": {"profile": {"$ifNull": [{"$first": "$profile"}, None]}}}
+    ]
     
-    return applications
+    # Profile filters run before the limit so pages stay full
+    profile_match = {}
+    if min_cgpa is not None:
+        profile_match["profile.cgpa"] = {"$gte": min_cgpa}
+    if skills:
+        profile_match["profile.skills"] = {"$all": skills}
+    if profile_match:
+        pipeline.append({"$match": profile_match})
+    if limit:
+        pipeline.append({"$limit": limit})
+    if not join_users:
+        return pipeline + [{"$project": {"_id": 0}}]
+    
+    # Users are only joined for the rows that survive the filters
+    pipeline += [
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0}}],
+            "as": "user"
+        }},
+        {"$set": {"user": {"$ifNull": [{"$first": "$user"}, None]}}},
+        {"$project": {"_id": 0}}
+    ]
+    return pipeline
 
 @api_router.get("/applications/drive/{drive_id}")
-async def get_drive_applications(drive_id: str, authorization: Optional[str] = Header(None), request: Request = None):
+@query_budget(4)
+async def get_drive_applications(
+    drive_id: str,
+    status: Optional[str] = None,
+    min_cgpa: Optional[float] = None,
+    skills: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    authorization: Optional[str] = Header(None),
+    request: Request = None,
+    response: Response = None
+):
     await get_admin_user(authorization, request)
     
-    applications = await db.applications.find({"drive_id": drive_id}, {"_id": 0}).to_list(1000)
+    after = decode_cursor(cursor, len(DRIVE_APPLICATIONS_SORT)) if cursor else None
+    
+    if stream:
+        # NDJSON rows straight off the cursor, memory stays flat whatever the drive size
+        pipeline = drive_applications_pipeline(drive_id, status, min_cgpa, skills, after)
+        
+        async def rows():
+            async for app in db.applications.aggregate(pipeline, batchSize=MAX_PAGE_SIZE):
+                yield json.dumps(app, default=json_default) + "\n"
+        
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
     
-    # Enrich with user data
-    for app in applications:
-        user_data = await db.users.find_one({"id": app["user_id"]}, {"_id": 0})
-        profile = await db.student_profiles.find_one({"user_id": app["user_id"]}, {"_id": 0})
-        app["user"] = user_data
-        app["profile"] = profile
+    pipeline = drive_applications_pipeline(drive_id, status, min_cgpa, skills, after, limit + 1)
+    applications = await db.applications.aggregate(pipeline).to_list(limit + 1)
+    
+    next_cursor = next_page(applications, limit, DRIVE_APPLICATIONS_SORT)
+    if next_cursor and response:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return applications
 
+# Exports
+# Column -> (source document, field)
+EXPORT_COLUMNS = {
+    "application_id": ("application", "id"),
+    "drive_id": ("application", "drive_id"),
+    "status": ("application", "status"),
+    "applied_at": ("application", "applied_at"),
+    "updated_at": ("application", "updated_at"),
+    "user_id": ("application", "user_id"),
+    "name": ("user", "name"),
+    "email": ("user", "email"),
+    "phone": ("profile", "phone"),
+    "college": ("profile", "college"),
+    "degree": ("profile", "degree"),
+    "graduation_year": ("profile", "graduation_year"),
+    "cgpa": ("profile", "cgpa"),
+    "skills": ("profile", "skills"),
+    "resume_url": ("profile", "resume_url"),
+    "company_name": ("drive", "company_name"),
+    "role": ("drive", "role"),
+    "ctc": ("drive", "ctc"),
+    "location": ("drive", "location"),
+}
+APPLICANT_EXPORT_COLUMNS = [column for column, (source, _) in EXPORT_COLUMNS.items() if source != "drive"]
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+
+def parse_export_columns(columns: Optional[str], default: List[str]) -> List[str]:
+    if not columns:
+        return default
+    selected = [column.strip() for column in columns.split(",") if column.strip()]
+    unknown = [column for column in selected if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+    return selected
+
+def export_value(value):
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def iter_export_rows(match: dict, columns: List[str], min_cgpa: Optional[float] = None,
+                           skills: Optional[List[str]] = None, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield batches of flat export rows, joining users, profiles and drives one batch at a time"""
+    sources = {EXPORT_COLUMNS[column][0] for column in columns}
+    # Profile filters need the profile even when no profile column is exported
+    if min_cgpa is not None or skills:
+        sources.add("profile")
+    
+    cursor = db.applications.find(match, {"_id": 0}).sort([("applied_at", ASCENDING), ("id", ASCENDING)]).batch_size(batch_size)
+    while True:
+        applications = await cursor.to_list(batch_size)
+        if not applications:
+            break
+        
+        user_ids = list({app["user_id"] for app in applications})
+        users, profiles, drives = {}, {}, {}
+        if "user" in sources:
+            async for user in db.users.find({"id": {"$in": user_ids}}, {"_id": 0}):
+                users[user["id"]] = user
+        if "profile" in sources:
+            async for profile in db.student_profiles.find({"user_id": {"$in": user_ids}}, {"_id": 0}):
+                profiles[profile["user_id"]] = profile
+        if "drive" in sources:
+            drive_ids = list({app["drive_id"] for app in applications})
+            async for drive in db.placement_drives.find({"id": {"$in": drive_ids}}, {"_id": 0}):
+                drives[drive["id"]] = drive
+        
+        rows = []
+        for app in applications:
+            docs = {
+                "application": app,
+                "user": users.get(app["user_id"], {}),
+                "profile": profiles.get(app["user_id"], {}),
+                "drive": drives.get(app["drive_id"], {})
+            }
+            profile = docs["profile"]
+            if min_cgpa is not None and (profile.get("cgpa") is None or profile["cgpa"] < min_cgpa):
+                continue
+            if skills and not set(skills).issubset(profile.get("skills") or []):
+                continue
+            rows.append([export_value(docs[source].get(field)) for source, field in (EXPORT_COLUMNS[c] for c in columns)])
+        if rows:
+            yield rows
+
+def export_response(batches, columns: List[str], export_format: str, filename: str) -> StreamingResponse:
+    """Stream row batches as CSV or NDJSON chunks"""
+    if export_format == "csv":
+        async def chunks():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            async for rows in batches:
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        media_type = "text/csv"
+    elif export_format == "ndjson":
+        async def chunks():
+            async for rows in batches:
+                yield "".join(json.dumps(dict(zip(columns, row)), default=json_default) + "\n" for row in rows)
+        media_type = "application/x-ndjson"
+    else:
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+@api_router.get("/applications/drive/{drive_id}/export")
+async def export_drive_applications(
+    drive_id: str,
+    format: str = "csv",
+    columns: Optional[str] = None,
+    status: Optional[str] = None,
+    min_cgpa: Optional[float] = None,
+    skills: Optional[List[str]] = Query(None),
+    authorization: Optional[str] = Header(None),
+    request: Request = None
+):
+    """Full applicant sheet of a drive, streamed with flat memory use"""
+    await get_admin_user(authorization, request)
+    
+    selected = parse_export_columns(columns, APPLICANT_EXPORT_COLUMNS)
+    match = {"drive_id": drive_id}
+    if status:
+        match["status"] = status
+    
+    batches = iter_export_rows(match, selected, min_cgpa, skills)
+    return export_response(batches, selected, format, f"drive-{drive_id}-applicants")
+
+@api_router.get("/admin/export/placements")
+async def export_placements(
+    format: str = "csv",
+    columns: Optional[str] = None,
+    status: str = "selected",
+    min_cgpa: Optional[float] = None,
+    skills: Optional[List[str]] = Query(None),
+    authorization: Optional[str] = Header(None),
+    request: Request = None
+):
+    """Applications of every drive in one status (selected by default) with drive details"""
+    await get_admin_user(authorization, request)
+    
+    selected = parse_export_columns(columns, list(EXPORT_COLUMNS))
+    batches = iter_export_rows({"status": status}, selected, min_cgpa, skills)
+    return export_response(batches, selected, format, f"placements-{status}")
+
 @api_router.put("/applications/{application_id}/status")
 async def update_application_status(application_id: str, status_update: ApplicationStatusUpdate, authorization: Optional[str] = Header(None), request: Request = None):
     await get_admin_user(authorization, request)
     
-    result = await db.applications.update_one(
-        {"id": application_id},
-        {"$set": {"status": status_update.status, "updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
+    target = status_update.status
+    if target not in STATUS_TRANSITIONS:
+        raise HTTPException(status_code=400, detail="Invalid status")
     
-    if result.matched_count == 0:
+    previous = await db.applications.find_one(
+        {"id": application_id}, {"_id": 0, "status": 1, "user_id": 1, "drive_id": 1}
+    )
+    if previous is None:
         raise HTTPException(status_code=404, detail="Application not found")
     
+    outcome = status_transition(previous.get("status"), target)
+    if outcome == "invalid_transition":
+        raise HTTPException(status_code=400, detail=f"Cannot move an application from {previous.get('status')} to {target}")
+    if outcome == "updated":
+        now = datetime.now(timezone.utc)
+        # Matching on the status we read makes a concurrent change a conflict, not an overwrite
+        result = await db.applications.update_one(
+            {"id": application_id, "status": previous.get("status")},
+            {"$set": {"status": target, "updated_at": now}}
+        )
+        if not result.modified_count:
+            raise HTTPException(status_code=409, detail="Application status changed meanwhile, reload and retry")
+        await bump_stats(statuses={previous.get("status"): -1, target: 1})
+        publish_status_change(previous, application_id, target, now)
+    
     return {"message": "Status updated successfully"}
 
+def publish_status_change(application: dict, application_id: str, status: str, updated_at: datetime):
+    event_broker.publish(user_channel(application["user_id"]), "application_status", {
+        "id": application_id,
+        "drive_id": application.get("drive_id"),
+        "status": status,
+        "previous_status": application.get("status"),
+        "updated_at": updated_at
+    })
+
+# Allowed status changes, terminal states have none
+STATUS_TRANSITIONS = {
+    "applied": {"shortlisted", "rejected"},
+    "shortlisted": {"selected", "rejected"},
+    "selected": set(),
+    "rejected": set()
+}
+MAX_BULK_UPDATE = 10000
+
+def status_transition(current: Optional[str], target: str) -> str:
+    """updated when current may move to target, otherwise unchanged or invalid_transition"""
+    if current == target:
+        return "unchanged"
+    if target not in STATUS_TRANSITIONS.get(current, set()):
+        return "invalid_transition"
+    return "updated"
+
+@api_router.post("/applications/bulk-status")
+async def bulk_update_application_status(bulk_update: BulkStatusUpdateRequest, authorization: Optional[str] = Header(None), request: Request = None):
+    """Move many applications to a new status with one unordered bulk_write"""
+    await get_admin_user(authorization, request)
+    
+    target = bulk_update.status
+    if target not in STATUS_TRANSITIONS:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    if bulk_update.application_ids:
+        ids = list(dict.fromkeys(bulk_update.application_ids))
+        if len(ids) > MAX_BULK_UPDATE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATE} applications per request")
+        candidates = await db.applications.find(
+            {"id": {"$in": ids}}, {"_id": 0, "id": 1, "status": 1, "user_id": 1, "drive_id": 1}
+        ).to_list(len(ids))
+    elif bulk_update.drive_id:
+        pipeline = drive_applications_pipeline(
+            bulk_update.drive_id, bulk_update.from_status, bulk_update.min_cgpa, bulk_update.skills,
+            limit=MAX_BULK_UPDATE + 1, join_users=False
+        )
+        pipeline.append({"$project": {"id": 1, "status": 1, "user_id": 1, "drive_id": 1}})
+        candidates = await db.applications.aggregate(pipeline).to_list(MAX_BULK_UPDATE + 1)
+        if len(candidates) > MAX_BULK_UPDATE:
+            raise HTTPException(status_code=400, detail=f"Filter matches more than {MAX_BULK_UPDATE} applications")
+        ids = [app["id"] for app in candidates]
+    else:
+        raise HTTPException(status_code=400, detail="application_ids or drive_id required")
+    
+    current = {app["id"]: app.get("status") for app in candidates}
+    applications = {app["id"]: app for app in candidates}
+    results = {}
+    operations = []
+    now = datetime.now(timezone.utc)
+    for application_id in ids:
+        if application_id not in current:
+            results[application_id] = "not_found"
+            continue
+        results[application_id] = status_transition(current[application_id], target)
+        if results[application_id] == "updated":
+            # Matching on the status we read makes a concurrent change a conflict, not an overwrite
+            operations.append(UpdateOne(
+                {"id": application_id, "status": current[application_id]},
+                {"$set": {"status": target, "updated_at": now}}
+            ))
+    
+    if operations:
+        result = await db.applications.bulk_write(operations, ordered=False)
+        if result.matched_count < len(operations):
+            pending = [application_id for application_id, outcome in results.items() if outcome == "updated"]
+            applied = await db.applications.find(
+                {"id": {"$in": pending}, "status": target}, {"_id": 0, "id": 1}
+            ).to_list(len(pending))
+            applied = {app["id"] for app in applied}
+            for application_id in pending:
+                if application_id not in applied:
+                    results[application_id] = "conflict"
+        
+        moved = {}
+        for application_id, outcome in results.items():
+            if outcome == "updated":
+                moved[current[application_id]] = moved.get(current[application_id], 0) - 1
+                moved[target] = moved.get(target, 0) + 1
+                publish_status_change(applications[application_id], application_id, target, now)
+        await bump_stats(statuses=moved)
+    
+    summary = {}
+    for outcome in results.values():
+        summary[outcome] = summary.get(outcome, 0) + 1
+    
+    return {
+        "status": target,
+        "requested": len(ids),
+        "summary": summary,
+        "results": [
+            {"id": application_id, "from": current.get(application_id), "result": outcome}
+            for application_id, outcome in results.items()
+        ]
+    }
+
 # Mock Test Routes
 @api_router.get("/tests")
-async def get_tests():
-    tests = await db.mock_tests.find({}, {"_id": 0, "questions": 0}).to_list(100)
-    return tests
+async def get_tests(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), request: Request = None):
+    async def load(response: Response):
+        return await find_page(db.mock_tests, {}, {"_id": 0, "questions": 0}, cursor, limit, response)
+    
+    return await cached_catalog(request, "tests", query_variant(request), load)
+
+# (test id, offset, limit) -> student-facing JSON body, answers already stripped
+test_render_cache = TTLCache(
+    maxsize=int(os.environ.get('TEST_RENDER_CACHE_SIZE', '512')),
+    ttl=float(os.environ.get('TEST_RENDER_CACHE_TTL', '300'))
+)
+
+def student_test_pipeline(test_id: str, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """A test without correct answers, optionally a page of its questions"""
+    pipeline = [
+        {"$match": {"id": test_id}},
+        {"$limit": 1},
+        {"$set": {"question_count": {"$size": {"$ifNull": ["$questions", []]}}}}
+    ]
+    if offset or limit:
+        questions = {"$ifNull": ["$questions", []]}
+        # $slice needs a positive count; without a limit that is everything from offset on
+        count = limit or {"$max": [{"$size": questions}, 1]}
+        pipeline.append({"$set": {"questions": {"$slice": [questions, offset, count]}}})
+    # Answers never leave the database
+    pipeline.append({"$unset": ["_id", "questions.correct_answer"]})
+    return pipeline
 
 @api_router.get("/tests/{test_id}")
-async def get_test(test_id: str, authorization: Optional[str] = Header(None), request: Request = None):
+@query_budget(4)
+async def get_test(
+    test_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    authorization: Optional[str] = Header(None),
+    request: Request = None
+):
     user = await get_current_user(authorization, request)
-    test = await db.mock_tests.find_one({"id": test_id}, {"_id": 0})
-    if not test:
-        raise HTTPException(status_code=404, detail="Test not found")
     
-    # Remove correct answers for students
-    for question in test["questions"]:
-        question.pop("correct_answer", None)
+    cache_key = (test_id, offset, limit)
+    body = test_render_cache.get(cache_key)
+    if body is None:
+        tests = await db.mock_tests.aggregate(student_test_pipeline(test_id, offset, limit)).to_list(1)
+        if not tests:
+            raise HTTPException(status_code=404, detail="Test not found")
+        body = json.dumps(tests[0], default=json_default).encode()
+        test_render_cache.set(cache_key, body)
     
-    return test
+    return Response(content=body, media_type="application/json")
+
+# Test id -> tuple of correct answers in question order
+answer_key_cache = TTLCache(
+    maxsize=int(os.environ.get('ANSWER_KEY_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('ANSWER_KEY_CACHE_TTL', '300'))
+)
+
+async def get_answer_key(test_id: str) -> Optional[tuple]:
+    key = answer_key_cache.get(test_id)
+    if key is None:
+        test = await db.mock_tests.find_one({"id": test_id}, {"_id": 0, "questions.correct_answer": 1})
+        if not test:
+            return None
+        key = tuple(question.get("correct_answer") for question in test.get("questions", []))
+        answer_key_cache.set(test_id, key)
+    return key
+
+# Test id -> catalogue header (everything but the questions) for attempt listings
+test_meta_cache = TTLCache(
+    maxsize=int(os.environ.get('TEST_META_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('TEST_META_CACHE_TTL', '600'))
+)
+
+async def get_test_headers(test_ids) -> dict:
+    """Catalogue headers by test id, fetching every cache miss in one query"""
+    headers = {}
+    missing = []
+    for test_id in set(test_ids):
+        header = test_meta_cache.get(test_id)
+        if header is None:
+            missing.append(test_id)
+        else:
+            headers[test_id] = header
+    if missing:
+        async for test in db.mock_tests.find({"id": {"$in": missing}}, {"_id": 0, "questions": 0}):
+            test_meta_cache.set(test["id"], test)
+            headers[test["id"]] = test
+    return headers
+
+def invalidate_test(test_id: str):
+    """Forget everything cached for a test after its document changes"""
+    answer_key_cache.pop(test_id)
+    test_meta_cache.pop(test_id)
+    test_render_cache.evict_where(lambda key, body: key[0] == test_id)
+    invalidate_catalog("tests")
+
+def score_answers(key: tuple, answers: List[dict]) -> int:
+    # zip() stops at the shorter side, extra answers never score
+    return sum(map(operator.eq, (answer.get("answer") for answer in answers), key))
+
+def score_batch(key: tuple, submissions: List[List[dict]]) -> List[int]:
+    return [score_answers(key, answers) for answers in submissions]
+
+# Write-behind for test attempts
+# When enabled, submit_test journals the attempt to a local file (fsync'd, grouped
+# across concurrent submits) and answers at once; a flusher inserts the queue with
+# insert_many. Journals left behind by a crashed worker are replayed on startup,
+# and attempt ids are unique, so a replay never duplicates an attempt.
+ATTEMPT_WRITE_BEHIND = os.environ.get('ATTEMPT_WRITE_BEHIND', 'false').lower() == 'true'
+ATTEMPT_QUEUE_SIZE = int(os.environ.get('ATTEMPT_QUEUE_SIZE', '10000'))
+ATTEMPT_BATCH_SIZE = int(os.environ.get('ATTEMPT_BATCH_SIZE', '500'))
+ATTEMPT_FLUSH_INTERVAL = float(os.environ.get('ATTEMPT_FLUSH_INTERVAL', '0.5'))
+# A submit waits this long for queue space, then writes directly
+ATTEMPT_ENQUEUE_TIMEOUT = float(os.environ.get('ATTEMPT_ENQUEUE_TIMEOUT', '2'))
+ATTEMPT_JOURNAL_DIR = Path(os.environ.get('ATTEMPT_JOURNAL_DIR', str(ROOT_DIR / 'journal')))
+
+try:
+    import fcntl
+except ImportError:  # Windows: no journal locking, run a single worker
+    fcntl = None
+
+class AttemptWriteBehind:
+    """Bounded, journaled queue of test attempts flushed in insert_many batches"""
+
+    def __init__(self):
+        self.slots = asyncio.Semaphore(ATTEMPT_QUEUE_SIZE)
+        self.buffer = []
+        self.wake = asyncio.Event()
+        self.journal = None
+        self.journal_path = None
+        self.unsynced = []
+        self.sync_task = None
+        self.journaling = 0
+        self.flusher = None
+        self.batch_sizes = LatencyHistogram(buckets=(1, 10, 50, 100, 250, 500, 1000, 5000))
+        self.flush_latency = LatencyHistogram()
+        self.stats = {"enqueued": 0, "flushed": 0, "direct": 0, "flush_errors": 0, "journal_errors": 0, "replayed": 0}
+
+    async def start(self):
+        ATTEMPT_JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+        self.journal_path = ATTEMPT_JOURNAL_DIR / f"attempts-{uuid.uuid4().hex}.ndjson"
+        self.journal = open(self.journal_path, "a+", encoding="utf-8")
+        if fcntl:
+            fcntl.flock(self.journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        await self.replay_orphans()
+        self.flusher = asyncio.create_task(self.flush_periodically())
+
+    async def replay_orphans(self):
+        """Insert attempts from journals whose worker is gone; a live worker holds its lock"""
+        for path in glob.glob(str(ATTEMPT_JOURNAL_DIR / "attempts-*.ndjson")):
+            if Path(path) == self.journal_path:
+                continue
+            with open(path, "r", encoding="utf-8") as orphan:
+                if fcntl:
+                    try:
+                        fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue
+                attempts = []
+                for line in orphan:
+                    try:
+                        attempt = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from the crash
+                    attempt["attempted_at"] = as_datetime(attempt["attempted_at"])
+                    attempts.append(attempt)
+                try:
+                    for start in range(0, len(attempts), ATTEMPT_BATCH_SIZE):
+                        await self.insert(attempts[start:start + ATTEMPT_BATCH_SIZE])
+                except PyMongoError:
+                    logger.exception("Replaying %s failed, leaving it for the next start", path)
+                    continue
+                self.stats["replayed"] += len(attempts)
+                os.unlink(path)
+            if attempts:
+                logger.info("Replayed %d journaled attempts from %s", len(attempts), path)
+
+    async def enqueue(self, attempt: dict) -> bool:
+        """Journal and queue an attempt; False when the queue stayed full or the journal failed, then write it directly"""
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout=ATTEMPT_ENQUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.stats["direct"] += 1
+            return False
+        
+        self.journaling += 1
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self.unsynced.append((json.dumps(attempt, default=json_default), future))
+            if self.sync_task is None or self.sync_task.done():
+                self.sync_task = asyncio.create_task(self.sync_journal())
+            await future
+        except OSError:
+            # E.g. a full disk: the database is still there, so the submit need not fail
+            self.slots.release()
+            self.stats["journal_errors"] += 1
+            self.stats["direct"] += 1
+            logger.exception("Journaling a test attempt failed, writing it directly")
+            return False
+        except BaseException:
+            # Including CancelledError, or the slot would never come back
+            self.slots.release()
+            raise
+        finally:
+            self.journaling -= 1
+        
+        self.buffer.append(attempt)
+        self.stats["enqueued"] += 1
+        if len(self.buffer) >= ATTEMPT_BATCH_SIZE:
+            self.wake.set()
+        return True
+
+    async def sync_journal(self):
+        # Group commit: every submit that arrived during the last fsync shares the next one
+        while self.unsynced:
+            entries, self.unsynced = self.unsynced, []
+            try:
+                await asyncio.to_thread(self.append_journal, [line for line, _ in entries])
+            except OSError as e:
+                for _, future in entries:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in entries:
+                    # A cancelled submit already gave its slot back
+                    if not future.done():
+                        future.set_result(None)
+
+    def append_journal(self, lines: List[str]):
+        self.journal.write("\n".join(lines) + "\n")
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    async def insert(self, batch: List[dict]):
+        try:
+            await db.test_attempts.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Already inserted by an earlier try or replay
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def flush(self) -> int:
+        if not self.buffer:
+            return 0
+        batch = self.buffer[:ATTEMPT_BATCH_SIZE]
+        started = time.perf_counter()
+        await self.insert([dict(attempt) for attempt in batch])
+        self.flush_latency.observe(time.perf_counter() - started)
+        self.batch_sizes.observe(len(batch))
+        del self.buffer[:len(batch)]
+        self.stats["flushed"] += len(batch)
+        for _ in batch:
+            self.slots.release()
+        if not self.buffer and not self.journaling:
+            # Everything journaled is in the database now
+            self.journal.truncate(0)
+        return len(batch)
+
+    async def flush_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=ATTEMPT_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            try:
+                while await self.flush() == ATTEMPT_BATCH_SIZE:
+                    pass
+            except Exception:
+                # The batch stays queued and journaled for the next round
+                self.stats["flush_errors"] += 1
+                logger.exception("Flushing %d queued attempts failed", len(self.buffer))
+
+    async def close(self):
+        """Stop the flusher and write out everything still queued"""
+        if self.flusher:
+            self.flusher.cancel()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+        if self.sync_task:
+            await asyncio.gather(self.sync_task, return_exceptions=True)
+        try:
+            while await self.flush():
+                pass
+        except PyMongoError:
+            # The journal keeps them, the next worker to start replays it
+            logger.exception("Shutting down with %d attempts still journaled", len(self.buffer))
+            self.journal.close()
+            return
+        self.journal.close()
+        os.unlink(self.journal_path)
+
+attempt_writer = AttemptWriteBehind()
 
 @api_router.post("/tests/submit")
 async def submit_test(submission: TestSubmission, authorization: Optional[str] = Header(None), request: Request = None):
     user = await get_current_user(authorization, request)
     
-    # Get test with correct answers
-    test = await db.mock_tests.find_one({"id": submission.test_id}, {"_id": 0})
-    if not test:
+    key = await get_answer_key(submission.test_id)
+    if key is None:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Calculate score
-    score = 0
-    total = len(test["questions"])
-    for i, answer in enumerate(submission.answers):
-        if i < len(test["questions"]) and answer.get("answer") == test["questions"][i].get("correct_answer"):
-            score += 1
+    score = score_answers(key, submission.answers)
+    total = len(key)
     
     # Save attempt
     attempt = TestAttempt(
@@ -478,28 +2352,114 @@ async def submit_test(submission: TestSubmission, authorization: Optional[str] =
         answers=submission.answers
     )
     attempt_dict = attempt.model_dump()
-    attempt_dict["attempted_at"] = attempt_dict["attempted_at"].isoformat()
     
-    await db.test_attempts.insert_one(attempt_dict)
+    if not (ATTEMPT_WRITE_BEHIND and await attempt_writer.enqueue(attempt_dict)):
+        await db.test_attempts.insert_one(attempt_dict)
     return {"score": score, "total": total, "percentage": round((score / total) * 100, 2)}
 
+# A student's attempts page newest first on (attempted_at, id)
+ATTEMPTS_SORT = ["attempted_at", "id"]
+
+def attempt_summary_pipeline(user_id: str) -> List[dict]:
+    """Best and latest score of a student on every test they attempted"""
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$sort": {"attempted_at": -1, "id": -1}},
+        {"$group": {
+            "_id": "$test_id",
+            "attempts": {"$sum": 1},
+            "best_score": {"$max": "$score"},
+            "best_percentage": {"$max": {"$cond": [
+                {"$gt": ["$total", 0]},
+                {"$round": [{"$multiply": [{"$divide": ["$score", "$total"]}, 100]}, 2]},
+                0
+            ]}},
+            "last_score": {"$first": "$score"},
+            "last_total": {"$first": "$total"},
+            "last_attempted_at": {"$first": "$attempted_at"}
+        }},
+        {"$project": {"_id": 0, "test_id": "$_id", "attempts": 1, "best_score": 1, "best_percentage": 1,
+                      "last_score": 1, "last_total": 1, "last_attempted_at": 1}},
+        {"$sort": {"last_attempted_at": -1}}
+    ]
+
 @api_router.get("/tests/attempts/my")
-async def get_my_attempts(authorization: Optional[str] = Header(None), request: Request = None):
+@query_budget(5)
+async def get_my_attempts(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    authorization: Optional[str] = Header(None),
+    request: Request = None,
+    response: Response = None
+):
     user = await get_current_user(authorization, request)
-    attempts = await db.test_attempts.find({"user_id": user.id}, {"_id": 0}).sort("attempted_at", -1).to_list(100)
     
-    # Enrich with test data
+    query = {"user_id": user.id}
+    if cursor:
+        query.update(keyset_filter(ATTEMPTS_SORT, decode_cursor(cursor, len(ATTEMPTS_SORT)), DESCENDING))
+    attempts = await db.test_attempts.find(query, {"_id": 0}).sort(
+        [(field, DESCENDING) for field in ATTEMPTS_SORT]
+    ).limit(limit + 1).to_list(limit + 1)
+    next_cursor = next_page(attempts, limit, ATTEMPTS_SORT)
+    if next_cursor and response:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    tests = await get_test_headers(attempt["test_id"] for attempt in attempts)
     for attempt in attempts:
-        test = await db.mock_tests.find_one({"id": attempt["test_id"]}, {"_id": 0, "questions": 0})
-        attempt["test"] = test
+        attempt["test"] = tests.get(attempt["test_id"])
     
     return attempts
 
+@api_router.get("/tests/attempts/my/summary")
+@query_budget(5)
+async def get_my_attempt_summary(authorization: Optional[str] = Header(None), request: Request = None):
+    user = await get_current_user(authorization, request)
+    summaries = await db.test_attempts.aggregate(attempt_summary_pipeline(user.id)).to_list(None)
+    
+    tests = await get_test_headers(summary["test_id"] for summary in summaries)
+    for summary in summaries:
+        summary["test"] = tests.get(summary["test_id"])
+    
+    return summaries
+
+@api_router.post("/admin/tests/{test_id}/regrade")
+async def regrade_test(test_id: str, authorization: Optional[str] = Header(None), request: Request = None):
+    """Re-score every attempt of a test against its current answer key"""
+    await get_admin_user(authorization, request)
+    
+    # The key was corrected in the database, never score against the cached one
+    invalidate_test(test_id)
+    key = await get_answer_key(test_id)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    regraded = 0
+    updated = 0
+    cursor = db.test_attempts.find({"test_id": test_id}, {"_id": 0, "id": 1, "answers": 1, "score": 1, "total": 1})
+    while True:
+        batch = await cursor.to_list(1000)
+        if not batch:
+            break
+        scores = score_batch(key, [attempt.get("answers", []) for attempt in batch])
+        operations = [
+            UpdateOne({"id": attempt["id"]}, {"$set": {"score": score, "total": len(key)}})
+            for attempt, score in zip(batch, scores)
+            if attempt.get("score") != score or attempt.get("total") != len(key)
+        ]
+        if operations:
+            result = await db.test_attempts.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        regraded += len(batch)
+    
+    return {"regraded": regraded, "updated": updated}
+
 # Resources Routes
 @api_router.get("/resources")
-async def get_resources():
-    resources = await db.resources.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return resources
+async def get_resources(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), request: Request = None):
+    async def load(response: Response):
+        return await find_page(db.resources, {}, {"_id": 0}, cursor, limit, response)
+    
+    return await cached_catalog(request, "resources", query_variant(request), load)
 
 @api_router.post("/resources")
 async def create_resource(resource_data: ResourceCreateRequest, authorization: Optional[str] = Header(None), request: Request = None):
@@ -507,9 +2467,9 @@ async def create_resource(resource_data: ResourceCreateRequest, authorization: O
     
     resource = Resource(**resource_data.model_dump())
     resource_dict = resource.model_dump()
-    resource_dict["created_at"] = resource_dict["created_at"].isoformat()
     
     await db.resources.insert_one(resource_dict)
+    invalidate_catalog("resources")
     return resource
 
 @api_router.delete("/resources/{resource_id}")
@@ -520,13 +2480,164 @@ async def delete_resource(resource_id: str, authorization: Optional[str] = Heade
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Resource not found")
     
+    invalidate_catalog("resources")
     return {"message": "Resource deleted successfully"}
 
+# Live events
+# In-process pub/sub behind GET /events (Server-Sent Events). Announcements go to
+# the global channel, application status changes to the applicant's user channel.
+EVENTS_REPLAY_SIZE = int(os.environ.get('EVENTS_REPLAY_SIZE', '100'))
+EVENTS_REPLAY_CHANNELS = int(os.environ.get('EVENTS_REPLAY_CHANNELS', '50000'))
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', '100'))
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', '15'))
+EVENTS_RETRY = float(os.environ.get('EVENTS_RETRY', '1'))
+ANNOUNCEMENTS_CHANNEL = "announcements"
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+class EventSubscriber:
+    def __init__(self, channels: set):
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        # Set when the queue overflowed; the client reconnects and resumes from the replay buffer
+        self.overflowed = False
+
+class ChannelReplay:
+    """The last EVENTS_REPLAY_SIZE events of one channel"""
+
+    def __init__(self):
+        self.events = deque()
+        # Sequence of the newest event pushed out, a client behind it cannot be replayed
+        self.dropped_through = 0
+
+    def append(self, message: tuple):
+        if len(self.events) >= EVENTS_REPLAY_SIZE:
+            self.dropped_through = self.events.popleft()[0]
+        self.events.append(message)
+
+class EventBroker:
+    """Fan-out to subscribers with a replay buffer per channel for Last-Event-ID resume"""
+
+    def __init__(self):
+        # Ids restart with the process, the prefix tells a resuming client which run it saw
+        self.prefix = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        # A bulk update to one channel cannot push other channels' events out
+        self.replay = OrderedDict()  # channel -> ChannelReplay, least recently published first
+        self.evicted_through = 0
+        self.channels = {}  # channel -> set of subscribers
+        self.subscribers = set()
+        self.stats = {"published": 0, "delivered": 0, "overflowed": 0}
+
+    def publish(self, channel: str, event: str, data: dict) -> str:
+        self.sequence += 1
+        message = (self.sequence, f"id: {self.prefix}-{self.sequence}\nevent: {event}\n"
+                   f"data: {json.dumps(data, default=json_default)}\n\n")
+        replay = self.replay.get(channel)
+        if replay is None:
+            replay = self.replay[channel] = ChannelReplay()
+            if len(self.replay) > EVENTS_REPLAY_CHANNELS:
+                _, oldest = self.replay.popitem(last=False)
+                self.evicted_through = max(self.evicted_through, oldest.events[-1][0])
+        else:
+            self.replay.move_to_end(channel)
+        replay.append(message)
+        self.stats["published"] += 1
+        for subscriber in self.channels.get(channel, ()):
+            if subscriber.overflowed:
+                continue
+            try:
+                subscriber.queue.put_nowait(message[1])
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # Never let one slow reader hold events for everyone else
+                subscriber.overflowed = True
+                self.stats["overflowed"] += 1
+        return f"{self.prefix}-{self.sequence}"
+
+    def subscribe(self, channels: set) -> EventSubscriber:
+        subscriber = EventSubscriber(channels)
+        self.subscribers.add(subscriber)
+        for channel in channels:
+            self.channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: EventSubscriber):
+        self.subscribers.discard(subscriber)
+        for channel in subscriber.channels:
+            listeners = self.channels.get(channel)
+            if listeners is not None:
+                listeners.discard(subscriber)
+                if not listeners:
+                    del self.channels[channel]
+
+    def missed(self, last_event_id: str, channels: set) -> Optional[List[str]]:
+        """Buffered events after last_event_id, None when they are no longer all buffered"""
+        prefix, _, sequence = last_event_id.partition("-")
+        if prefix != self.prefix or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        missed = []
+        for channel in channels:
+            replay = self.replay.get(channel)
+            if replay is None:
+                # Either nothing was published here, or its buffer was evicted after sequence
+                if sequence < self.evicted_through:
+                    return None
+                continue
+            if replay.dropped_through > sequence:
+                return None
+            missed += [message for message in replay.events if message[0] > sequence]
+        return [text for _, text in sorted(missed)]
+
+event_broker = EventBroker()
+
+@api_router.get("/events")
+async def stream_events(
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    request: Request = None
+):
+    user = await get_current_user(authorization, request)
+    channels = {ANNOUNCEMENTS_CHANNEL, user_channel(user.id)}
+    # Subscribe before reading the replay buffer so nothing published in between is lost
+    subscriber = event_broker.subscribe(channels)
+    missed = event_broker.missed(last_event_id, channels) if last_event_id else []
+    
+    async def stream():
+        try:
+            # Reconnect quickly, e.g. after an overflow closed the stream
+            yield f"retry: {int(EVENTS_RETRY * 1000)}\n\n"
+            if missed is None:
+                # Too far behind for the buffer, the client refetches instead
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                for text in missed:
+                    yield text
+            while not subscriber.overflowed:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout=EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+            # Flush what was queued, then end the stream so the client resumes with Last-Event-ID
+            while not subscriber.queue.empty():
+                yield subscriber.queue.get_nowait()
+        finally:
+            event_broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 # Announcements Routes
 @api_router.get("/announcements")
-async def get_announcements():
-    announcements = await db.announcements.find({}, {"_id": 0}).sort("created_at", -1).limit(10).to_list(10)
-    return announcements
+async def get_announcements(request: Request = None):
+    async def load(response: Response):
+        return await db.announcements.find({}, {"_id": 0}).sort("created_at", -1).limit(10).to_list(10)
+    
+    return await cached_catalog(request, "announcements", "", load)
 
 @api_router.post("/announcements")
 async def create_announcement(announcement_data: AnnouncementCreateRequest, authorization: Optional[str] = Header(None), request: Request = None):
@@ -534,51 +2645,408 @@ async def create_announcement(announcement_data: AnnouncementCreateRequest, auth
     
     announcement = Announcement(**announcement_data.model_dump())
     ann_dict = announcement.model_dump()
-    ann_dict["created_at"] = ann_dict["created_at"].isoformat()
     
     await db.announcements.insert_one(ann_dict)
+    invalidate_catalog("announcements")
+    event_broker.publish(ANNOUNCEMENTS_CHANNEL, "announcement", announcement.model_dump())
     return announcement
 
+# Admin User Management
+@api_router.put("/admin/users/{user_id}/role")
+async def update_user_role(user_id: str, role_update: RoleUpdateRequest, authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    
+    if role_update.role not in ("student", "admin", "recruiter"):
+        raise HTTPException(status_code=400, detail="Invalid role")
+    
+    previous = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$set": {"role": role_update.role}},
+        projection={"_id": 0, "role": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    was_student = previous.get("role") == "student"
+    if was_student != (role_update.role == "student"):
+        await bump_stats(students=-1 if was_student else 1)
+    
+    # Cached sessions still carry the old role
+    evict_user_sessions(user_id)
+    
+    return {"message": "Role updated successfully"}
+
 # Admin Stats
+@api_router.get("/admin/sessions/stats")
+async def get_session_stats(authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    
+    total = await db.user_sessions.estimated_document_count()
+    # Legacy string expiries count until migrate_datetimes.py has run
+    active = await db.user_sessions.count_documents(date_range("expires_at", gte=datetime.now(timezone.utc)))
+    last_duration = session_purge_stats["last_duration_ms"]
+    
+    return {
+        "total": total,
+        "active": active,
+        "purge": {
+            **session_purge_stats,
+            "last_rate_per_sec": round(session_purge_stats["last_purged"] / (last_duration / 1000), 2) if last_duration else 0.0
+        }
+    }
+
+@api_router.get("/admin/upstream/stats")
+async def get_upstream_stats(authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    return {
+        "auth": {
+            **auth_upstream_stats,
+            "latency_seconds": auth_upstream_latency.snapshot()
+        }
+    }
+
+@api_router.get("/admin/cache/stats")
+async def get_cache_stats(authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    return {
+        "sessions": session_cache.stats(),
+        "answer_keys": answer_key_cache.stats(),
+        "drive_states": drive_state_cache.stats(),
+        "test_renders": test_render_cache.stats(),
+        "test_meta": test_meta_cache.stats(),
+        "catalog": {**catalog_cache.stats(), **catalog_counters}
+    }
+
 @api_router.get("/admin/stats")
 async def get_admin_stats(authorization: Optional[str] = Header(None), request: Request = None):
     await get_admin_user(authorization, request)
     
-    total_students = await db.users.count_documents({"role": "student"})
-    total_drives = await db.placement_drives.count_documents({})
-    total_applications = await db.applications.count_documents({})
-    placed_students = await db.applications.count_documents({"status": "selected"})
-    
-    # Applications by status
-    pipeline = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    status_stats = await db.applications.aggregate(pipeline).to_list(100)
+    stats = await db.stats.find_one({"_id": STATS_ID})
+    if not stats or "reconciled_at" not in stats:
+        # First read, or only increments so far: build the baseline once
+        stats = await reconcile_stats()
     
+    statuses = stats.get("status", {})
     return {
-        "total_students": total_students,
-        "total_drives": total_drives,
-        "total_applications": total_applications,
-        "placed_students": placed_students,
-        "status_breakdown": status_stats
+        "total_students": stats.get("total_students", 0),
+        "total_drives": stats.get("total_drives", 0),
+        "total_applications": stats.get("total_applications", 0),
+        "placed_students": statuses.get("selected", 0),
+        "status_breakdown": [{"_id": status, "count": count} for status, count in statuses.items() if count]
     }
 
+@api_router.get("/admin/stats/reconcile")
+async def get_stats_reconcile_info(authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    return stats_reconcile_info
+
+@api_router.post("/admin/stats/reconcile")
+async def run_stats_reconcile(authorization: Optional[str] = Header(None), request: Request = None):
+    await get_admin_user(authorization, request)
+    await reconcile_stats()
+    return stats_reconcile_info
+
+# Cross-worker cache invalidation
+# Every worker watches the collections behind its caches, so a write handled by one
+# worker evicts the stale entries of all of them. Needs a replica set; on a standalone
+# server the watcher logs a warning and each worker only sees its own writes.
+CHANGE_STREAMS = os.environ.get('CHANGE_STREAMS', 'true').lower() == 'true'
+CHANGE_STREAM_ID = "cache_invalidation"
+CHANGE_STREAM_CHECKPOINT = float(os.environ.get('CHANGE_STREAM_CHECKPOINT', '5'))
+# collMod on the watched collections needs a privileged user; off means deletes clear broadly
+CHANGE_STREAM_PRE_IMAGES = os.environ.get('CHANGE_STREAM_PRE_IMAGES', 'false').lower() == 'true'
+WATCHED_COLLECTIONS = ["placement_drives", "mock_tests", "resources", "announcements", "users", "user_sessions"]
+# Server error codes: not a replica set, resume token no longer in the oplog or not
+# resumable (InvalidResumeToken), unauthorized / authentication failed (retrying will not help)
+CHANGE_STREAMS_UNSUPPORTED = {40573}
+CHANGE_STREAM_HISTORY_LOST = {286, 280, 260}
+CHANGE_STREAM_FATAL = {13, 18}
+change_stream_stats = {"running": False, "events": 0, "errors": 0, "resets": 0, "last_event_at": None}
+
+def clear_collection_caches(collection: str):
+    """Broad invalidation for when a change does not say which document it touched"""
+    if collection == "placement_drives":
+        invalidate_drive()
+        invalidate_catalog("drive")
+        drive_state_cache.clear()
+    elif collection == "mock_tests":
+        answer_key_cache.clear()
+        test_meta_cache.clear()
+        test_render_cache.clear()
+        invalidate_catalog("tests")
+    elif collection in ("resources", "announcements"):
+        invalidate_catalog(collection)
+    elif collection in ("users", "user_sessions"):
+        session_cache.clear()
+
+def invalidate_from_change(change: dict):
+    collection = change.get("ns", {}).get("coll")
+    # Post-image for inserts and updates, pre-image (when enabled) for deletes
+    doc = change.get("fullDocument") or change.get("fullDocumentBeforeChange")
+    if change["operationType"] in ("drop", "rename", "dropDatabase", "invalidate") or not doc:
+        for name in ([collection] if collection else WATCHED_COLLECTIONS):
+            clear_collection_caches(name)
+        return
+    
+    if collection == "placement_drives":
+        invalidate_drive(doc.get("id"))
+    elif collection == "mock_tests":
+        invalidate_test(doc.get("id"))
+    elif collection in ("resources", "announcements"):
+        invalidate_catalog(collection)
+    elif collection == "users":
+        evict_user_sessions(doc.get("id"))
+    elif collection == "user_sessions":
+        session_cache.pop(doc.get("session_token"))
+
+async def enable_pre_images() -> bool:
+    """Deletes only carry the _id unless the collection records pre-images (MongoDB 6.0+)"""
+    enabled = False
+    for collection in WATCHED_COLLECTIONS:
+        try:
+            await db.command("collMod", collection, changeStreamPreAndPostImages={"enabled": True})
+            enabled = True
+        except OperationFailure as e:
+            # Older server or missing collection: its deletes fall back to broad invalidation
+            logger.info("No change stream pre-images for %s: %s", collection, e)
+    return enabled
+
+async def save_resume_token(token, invalidated: bool = False):
+    await db.change_streams.update_one(
+        {"_id": CHANGE_STREAM_ID},
+        {"$set": {"token": token, "invalidated": invalidated, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+async def watch_cache_invalidations():
+    checkpoint = await db.change_streams.find_one({"_id": CHANGE_STREAM_ID})
+    token = checkpoint.get("token") if checkpoint else None
+    # resume_after rejects the token of an invalidate event (drop, rename), start_after takes it
+    invalidated = bool(checkpoint and checkpoint.get("invalidated"))
+    pre_images = CHANGE_STREAM_PRE_IMAGES and await enable_pre_images()
+    pipeline = [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}]
+    saved_at = time.monotonic()
+    
+    while True:
+        try:
+            async with db.watch(
+                pipeline,
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable" if pre_images else None,
+                resume_after=None if invalidated else token,
+                start_after=token if invalidated else None
+            ) as stream:
+                change_stream_stats["running"] = True
+                async for change in stream:
+                    invalidate_from_change(change)
+                    change_stream_stats["events"] += 1
+                    change_stream_stats["last_event_at"] = datetime.now(timezone.utc)
+                    token = stream.resume_token
+                    invalidated = change["operationType"] == "invalidate"
+                    # The stream ends after an invalidate, so that token is saved right away
+                    if invalidated or time.monotonic() - saved_at >= CHANGE_STREAM_CHECKPOINT:
+                        await save_resume_token(token, invalidated)
+                        saved_at = time.monotonic()
+        except asyncio.CancelledError:
+            if token:
+                await save_resume_token(token, invalidated)
+            raise
+        except OperationFailure as e:
+            change_stream_stats["running"] = False
+            if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                logger.warning("Change streams unavailable (%s), caches are only invalidated by local writes", e)
+                return
+            if e.code in CHANGE_STREAM_FATAL:
+                logger.error("Change stream not permitted (%s), caches are only invalidated by local writes", e)
+                return
+            change_stream_stats["errors"] += 1
+            if e.code in CHANGE_STREAM_HISTORY_LOST:
+                # Whatever changed in the gap is unknown: start over from now with empty caches
+                logger.warning("Change stream resume token expired, clearing caches")
+                change_stream_stats["resets"] += 1
+                token = None
+                invalidated = False
+                for collection in WATCHED_COLLECTIONS:
+                    clear_collection_caches(collection)
+            else:
+                logger.exception("Change stream failed, reconnecting")
+                await asyncio.sleep(1)
+        except PyMongoError:
+            change_stream_stats["running"] = False
+            change_stream_stats["errors"] += 1
+            logger.exception("Change stream failed, reconnecting")
+            await asyncio.sleep(1)
+
 app.include_router(api_router)
 
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+def render_metrics() -> str:
+    """Everything the admin stats routes report, in Prometheus text format"""
+    lines = [
+        "# HELP http_requests_total HTTP responses by route, method and status.",
+        "# TYPE http_requests_total counter"
+    ]
+    for (route, method, status), count in sorted(route_metrics.responses.items()):
+        lines.append(f"http_requests_total{{{prometheus_labels(route=route, method=method, status=status)}}} {count}")
+    
+    lines += [
+        "# HELP http_request_duration_seconds Time from request start to the last response byte.",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for (route, method), histogram in sorted(route_metrics.latency.items()):
+        prometheus_histogram(lines, "http_request_duration_seconds", histogram.snapshot(), route=route, method=method)
+    
+    commands = sorted(mongo_metrics.snapshot().items())
+    lines += [
+        "# HELP mongodb_command_duration_seconds MongoDB command round trips by route, collection and command.",
+        "# TYPE mongodb_command_duration_seconds histogram"
+    ]
+    for (route, collection, command), (snapshot, _) in commands:
+        prometheus_histogram(lines, "mongodb_command_duration_seconds", snapshot, route=route, collection=collection, command=command)
+    lines += [
+        "# HELP mongodb_command_failures_total MongoDB commands that returned an error.",
+        "# TYPE mongodb_command_failures_total counter"
+    ]
+    for (route, collection, command), (_, failures) in commands:
+        lines.append(f"mongodb_command_failures_total{{{prometheus_labels(route=route, collection=collection, command=command)}}} {failures}")
+    
+    caches = {
+        "sessions": session_cache,
+        "answer_keys": answer_key_cache,
+        "drive_states": drive_state_cache,
+        "test_renders": test_render_cache,
+        "test_meta": test_meta_cache,
+        "catalog": catalog_cache
+    }
+    for metric, kind, field in (
+        ("cache_hits_total", "counter", "hits"),
+        ("cache_misses_total", "counter", "misses"),
+        ("cache_evictions_total", "counter", "evictions"),
+        ("cache_entries", "gauge", "size")
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, cache in caches.items():
+            lines.append(f"{metric}{{{prometheus_labels(cache=name)}}} {cache.stats()[field]}")
+    lines.append("# TYPE catalog_not_modified_total counter")
+    lines.append(f"catalog_not_modified_total {catalog_counters['not_modified']}")
+    
+    for field in ("requests", "errors", "retries"):
+        lines.append(f"# TYPE auth_upstream_{field}_total counter")
+        lines.append(f"auth_upstream_{field}_total {auth_upstream_stats[field]}")
+    lines.append("# TYPE auth_upstream_duration_seconds histogram")
+    prometheus_histogram(lines, "auth_upstream_duration_seconds", auth_upstream_latency.snapshot())
+    
+    lines.append("# TYPE events_subscribers gauge")
+    lines.append(f"events_subscribers {len(event_broker.subscribers)}")
+    for field in ("published", "delivered", "overflowed"):
+        lines.append(f"# TYPE events_{field}_total counter")
+        lines.append(f"events_{field}_total {event_broker.stats[field]}")
+    
+    lines.append("# TYPE change_stream_running gauge")
+    lines.append(f"change_stream_running {int(change_stream_stats['running'])}")
+    for field in ("events", "errors", "resets"):
+        lines.append(f"# TYPE change_stream_{field}_total counter")
+        lines.append(f"change_stream_{field}_total {change_stream_stats[field]}")
+    
+    if ATTEMPT_WRITE_BEHIND:
+        lines.append("# TYPE attempt_queue_depth gauge")
+        lines.append(f"attempt_queue_depth {len(attempt_writer.buffer)}")
+        lines.append("# TYPE attempt_queue_capacity gauge")
+        lines.append(f"attempt_queue_capacity {ATTEMPT_QUEUE_SIZE}")
+        for field in ("enqueued", "flushed", "direct", "flush_errors", "journal_errors", "replayed"):
+            lines.append(f"# TYPE attempt_{field}_total counter")
+            lines.append(f"attempt_{field}_total {attempt_writer.stats[field]}")
+        lines.append("# TYPE attempt_flush_batch_size histogram")
+        prometheus_histogram(lines, "attempt_flush_batch_size", attempt_writer.batch_sizes.snapshot())
+        lines.append("# TYPE attempt_flush_duration_seconds histogram")
+        prometheus_histogram(lines, "attempt_flush_duration_seconds", attempt_writer.flush_latency.snapshot())
+    
+    lines.append("# TYPE session_purge_runs_total counter")
+    lines.append(f"session_purge_runs_total {session_purge_stats['runs']}")
+    lines.append("# TYPE sessions_purged_total counter")
+    lines.append(f"sessions_purged_total {session_purge_stats['purged']}")
+    return "\n".join(lines) + "\n"
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if SESSION_SLIDING:
+    app.add_middleware(SessionCookieMiddleware)
+
+if QUERY_PROFILE != "off":
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Outermost, so its timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Long-running tasks started with the app, cancelled on shutdown
+background_tasks = []
+
+@app.on_event("startup")
+async def create_indexes():
+    failed = await ensure_indexes()
+    if failed:
+        logger.warning("Serving without indexes: %s", ", ".join(failed))
+
+@app.on_event("startup")
+async def backfill_drives():
+    backfilled = await backfill_drive_fields()
+    if backfilled:
+        logger.info("Parsed ctc and eligibility of %d drives", backfilled)
+
+@app.on_event("startup")
+async def start_attempt_writer():
+    if ATTEMPT_WRITE_BEHIND:
+        await attempt_writer.start()
+
+@app.on_event("startup")
+async def open_auth_client():
+    get_auth_client()
+
+@app.on_event("startup")
+async def start_background_tasks():
+    background_tasks.append(asyncio.create_task(purge_sessions_periodically()))
+    background_tasks.append(asyncio.create_task(reconcile_stats_periodically()))
+    if CHANGE_STREAMS:
+        background_tasks.append(asyncio.create_task(watch_cache_invalidations()))
+
+@app.on_event("shutdown")
+async def flush_attempt_writer():
+    if ATTEMPT_WRITE_BEHIND:
+        await attempt_writer.close()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+@app.on_event("shutdown")
+async def close_auth_client():
+    if auth_client is not None:
+        await auth_client.aclose()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
@@ -0,0 +1,140 @@
+"""
+Query Budget Tests for PlacementPro
+Runs every route declared with @query_budget against a scratch database with
+QUERY_PROFILE=strict, so a route that issues more MongoDB commands than its
+budget fails here instead of only logging a warning. Caches are emptied before
+each request, so the session lookup counts against the budget as it does on a
+cold worker. The scratch database is dropped afterwards.
+
+Needs a running MongoDB (MONGO_URL from .env, default localhost); skipped without one.
+
+Usage: python -m pytest test_query_budgets.py
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db') + "_budgets"
+
+# The profiler middleware is only installed when QUERY_PROFILE is on at import time
+os.environ['MONGO_URL'] = mongo_url
+os.environ['DB_NAME'] = db_name
+os.environ['QUERY_PROFILE'] = 'strict'
+import server  # noqa: E402
+
+# Enough rows per list that a per-row query would blow every budget
+ROWS = 5
+
+# (endpoint name, path, who calls it) for every budgeted route
+CASES = [
+    ("get_my_applications", "/api/applications/my", "student"),
+    ("get_drive_applications", "/api/applications/drive/{drive_id}", "admin"),
+    ("get_test", "/api/tests/{test_id}", "student"),
+    ("get_test", "/api/tests/{test_id}?offset=1&limit=2", "student"),
+    ("get_my_attempts", "/api/tests/attempts/my", "student"),
+    ("get_my_attempt_summary", "/api/tests/attempts/my/summary", "student"),
+]
+
+def budgeted_routes() -> set:
+    return {
+        route.endpoint.__name__ for route in server.app.routes
+        if hasattr(getattr(route, "endpoint", None), "query_budget")
+    }
+
+async def seed() -> dict:
+    db = server.db
+    now = datetime.now(timezone.utc)
+    await server.ensure_indexes(db)
+
+    async def user(role: str) -> tuple:
+        user_id, token = str(uuid.uuid4()), f"budget-{uuid.uuid4().hex}"
+        await db.users.insert_one({"id": user_id, "email": f"{user_id}@budget.local", "name": role.title(), "role": role, "created_at": now})
+        await db.user_sessions.insert_one({"user_id": user_id, "session_token": token, "expires_at": now + timedelta(hours=1), "created_at": now})
+        if role == "student":
+            await db.student_profiles.insert_one({"id": str(uuid.uuid4()), "user_id": user_id, "skills": ["Python"], "cgpa": 8.0, "updated_at": now})
+        return user_id, token
+
+    student_id, student_token = await user("student")
+    _, admin_token = await user("admin")
+    drive_ids = [str(uuid.uuid4()) for _ in range(ROWS)]
+    await db.placement_drives.insert_many([{
+        "id": drive_id, "company_name": f"Budget {i}", "role": "Engineer", "description": "", "eligibility": "",
+        "ctc": "₹10-12 LPA", "location": "Remote", "status": "active", "skills_required": ["Python"],
+        "application_deadline": now + timedelta(days=7), "created_at": now
+    } for i, drive_id in enumerate(drive_ids)])
+
+    # The student applied everywhere, and the first drive has more applicants besides
+    applicants = [student_id] + [(await user("student"))[0] for _ in range(ROWS - 1)]
+    applications = [(student_id, drive_id) for drive_id in drive_ids] + [(user_id, drive_ids[0]) for user_id in applicants[1:]]
+    await db.applications.insert_many([{
+        "id": str(uuid.uuid4()), "drive_id": drive_id, "user_id": user_id, "status": "applied",
+        "applied_at": now - timedelta(minutes=i), "updated_at": now
+    } for i, (user_id, drive_id) in enumerate(applications)])
+
+    test_ids = [str(uuid.uuid4()) for _ in range(ROWS)]
+    questions = [{"question": f"Q{q}", "options": ["a", "b"], "correct_answer": "a"} for q in range(4)]
+    await db.mock_tests.insert_many([{
+        "id": test_id, "title": f"Budget {i}", "category": "Aptitude", "duration": 10, "questions": questions, "created_at": now
+    } for i, test_id in enumerate(test_ids)])
+    await db.test_attempts.insert_many([{
+        "id": str(uuid.uuid4()), "test_id": test_id, "user_id": student_id, "score": 1, "total": len(questions),
+        "answers": [], "attempted_at": now - timedelta(minutes=i * 2 + attempt)
+    } for i, test_id in enumerate(test_ids) for attempt in range(2)])
+
+    return {
+        "tokens": {"student": student_token, "admin": admin_token},
+        "drive_id": drive_ids[0],
+        "test_id": test_ids[0]
+    }
+
+async def call(path: str, token: str) -> httpx.Response:
+    for cache in (server.session_cache, server.test_render_cache, server.test_meta_cache, server.catalog_cache):
+        cache.clear()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budget.local") as http:
+        # QueryProfilerMiddleware raises QueryBudgetExceeded through the transport
+        return await http.get(path, headers={"Authorization": f"Bearer {token}"})
+
+@pytest.fixture(scope="module")
+def loop():
+    # One loop for the whole module: the server's Motor client stays bound to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="module")
+def fixtures(loop):
+    probe = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=2000)
+    try:
+        loop.run_until_complete(probe.admin.command("ping"))
+    except PyMongoError:
+        pytest.skip(f"No MongoDB reachable at {mongo_url}")
+    finally:
+        probe.close()
+
+    try:
+        yield loop.run_until_complete(seed())
+    finally:
+        loop.run_until_complete(server.client.drop_database(db_name))
+        server.client.close()
+
+def test_every_budgeted_route_is_covered():
+    assert budgeted_routes() == {name for name, _, _ in CASES}
+
+@pytest.mark.parametrize("name,path,role", CASES, ids=[path for _, path, _ in CASES])
+def test_route_stays_within_budget(loop, fixtures, name, path, role):
+    response = loop.run_until_complete(call(path.format(**fixtures), fixtures["tokens"][role]))
+    assert response.status_code == 200, response.text
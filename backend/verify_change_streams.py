@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Change Stream Invalidation Check for PlacementPro
+Fills the server's in-process caches, writes through a separate client the way
+another uvicorn worker would, and checks that the change stream listener evicts
+every stale entry, including changes made while the listener was stopped.
+Runs against a scratch database that is dropped afterwards.
+
+Needs a replica set; a single local node is enough:
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+
+Usage: python verify_change_streams.py
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db') + "_changes"
+
+os.environ['MONGO_URL'] = mongo_url
+os.environ['DB_NAME'] = db_name
+import server  # noqa: E402
+
+# The "other worker"
+other = AsyncIOMotorClient(mongo_url, tz_aware=True)[db_name]
+
+async def wait_until(predicate, timeout: float = 5) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return predicate()
+
+def cached(cache, key) -> bool:
+    # Read the entries directly so the cache's hit/miss counters stay untouched
+    return key in cache._data
+
+async def start_listener() -> asyncio.Task:
+    task = asyncio.create_task(server.watch_cache_invalidations())
+    if not await wait_until(lambda: server.change_stream_stats["running"] or task.done()) or task.done():
+        raise RuntimeError("Change stream did not start, is MongoDB running as a replica set?")
+    # The stream opens asynchronously after the flag is set
+    await asyncio.sleep(0.5)
+    return task
+
+async def stop_listener(task: asyncio.Task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    server.change_stream_stats["running"] = False
+
+async def seed() -> dict:
+    now = datetime.now(timezone.utc)
+    ids = {name: str(uuid.uuid4()) for name in ("drive", "test", "user")}
+    ids["token"] = f"verify-{uuid.uuid4().hex}"
+    await other.placement_drives.insert_one({
+        "id": ids["drive"], "company_name": "Verify", "role": "Engineer", "status": "active",
+        "application_deadline": now + timedelta(days=7), "created_at": now
+    })
+    await other.mock_tests.insert_one({
+        "id": ids["test"], "title": "Verify", "questions": [{"question": "?", "options": ["a", "b"], "correct_answer": "a"}],
+        "created_at": now
+    })
+    await other.users.insert_one({"id": ids["user"], "email": f"{ids['user']}@verify.local", "name": "Verify", "role": "student", "created_at": now})
+    await other.user_sessions.insert_one({"user_id": ids["user"], "session_token": ids["token"], "expires_at": now + timedelta(days=1), "created_at": now})
+    await other.announcements.insert_one({"id": str(uuid.uuid4()), "title": "Verify", "content": "", "created_at": now})
+    return ids
+
+async def check(name: str, fill, write, is_cached) -> bool:
+    await fill()
+    if not is_cached():
+        print(f"❌ {name:<40} nothing was cached to begin with")
+        return False
+    await write()
+    if await wait_until(lambda: not is_cached()):
+        print(f"✓ {name:<41} evicted")
+        return True
+    print(f"❌ {name:<40} still cached after 5s")
+    return False
+
+async def verify_change_streams() -> int:
+    print(f"🔁 Verifying change stream invalidation against {db_name}\n")
+
+    task = None
+    try:
+        await server.ensure_indexes()
+        ids = await seed()
+        task = await start_listener()
+        results = []
+
+        results.append(await check(
+            "placement_drives update -> drive state",
+            lambda: server.get_drive_state(ids["drive"]),
+            lambda: other.placement_drives.update_one({"id": ids["drive"]}, {"$set": {"status": "closed"}}),
+            lambda: cached(server.drive_state_cache, ids["drive"])
+        ))
+        results.append(await check(
+            "mock_tests update -> answer key",
+            lambda: server.get_answer_key(ids["test"]),
+            lambda: other.mock_tests.update_one({"id": ids["test"]}, {"$set": {"questions.0.correct_answer": "b"}}),
+            lambda: cached(server.answer_key_cache, ids["test"])
+        ))
+        results.append(await check(
+            "users role change -> sessions",
+            lambda: server.get_current_user(f"Bearer {ids['token']}"),
+            lambda: other.users.update_one({"id": ids["user"]}, {"$set": {"role": "admin"}}),
+            lambda: cached(server.session_cache, ids["token"])
+        ))
+
+        async def fill_announcements():
+            server.catalog_cache.set(("announcements", ""), (b"[]", '"verify"', {}))
+        results.append(await check(
+            "announcements insert -> catalog",
+            fill_announcements,
+            lambda: other.announcements.insert_one({"id": str(uuid.uuid4()), "title": "New", "content": "", "created_at": datetime.now(timezone.utc)}),
+            lambda: cached(server.catalog_cache, ("announcements", ""))
+        ))
+        results.append(await check(
+            "user_sessions delete (logout) -> session",
+            lambda: server.get_current_user(f"Bearer {ids['token']}"),
+            lambda: other.user_sessions.delete_one({"session_token": ids["token"]}),
+            lambda: cached(server.session_cache, ids["token"])
+        ))
+
+        # A change made while the listener is down must be picked up from the stored token
+        await server.get_drive_state(ids["drive"])
+        await stop_listener(task)
+        await other.placement_drives.update_one({"id": ids["drive"]}, {"$set": {"status": "active"}})
+        task = await start_listener()
+        if await wait_until(lambda: not cached(server.drive_state_cache, ids["drive"])):
+            print(f"✓ {'resume token after restart':<41} evicted")
+            results.append(True)
+        else:
+            print(f"❌ {'resume token after restart':<40} change made while stopped was missed")
+            results.append(False)
+
+        print()
+        failed = results.count(False)
+        if failed:
+            print(f"❌ {failed} of {len(results)} invalidation checks failed")
+            return 1
+        print(f"✨ All {len(results)} invalidation checks passed")
+        return 0
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        return 1
+    finally:
+        if task:
+            await stop_listener(task)
+        await server.client.drop_database(db_name)
+        server.client.close()
+        other.client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(verify_change_streams()))
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Index Verification Script for PlacementPro
+Ensures the server's index set and checks that every route query shape is
+served by an index. Aggregations are explained with executionStats against keys
+sampled from the data, so every $lookup actually runs and reports how it read the
+joined collection. Exits non-zero if any winning plan or $lookup falls back to
+COLLSCAN.
+
+Usage: python verify_indexes.py [--skip-ensure]
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'placement_manager_db')
+
+client = AsyncIOMotorClient(mongo_url)
+db = client[db_name]
+
+# Query shapes come from the server itself so both stay in sync
+os.environ.setdefault('MONGO_URL', mongo_url)
+os.environ.setdefault('DB_NAME', db_name)
+from server import (  # noqa: E402
+    ensure_indexes,
+    my_applications_pipeline,
+    drive_applications_pipeline,
+    student_test_pipeline,
+    attempt_summary_pipeline,
+    stats_pipeline,
+    drives_query,
+    drive_search_pipeline,
+    date_range,
+    keyset_filter,
+    CATALOG_SORT,
+    STATS_ID,
+    DESCENDING
+)
+
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+NOW = datetime.now(timezone.utc)
+CATALOG_ORDER = {field: -1 for field in CATALOG_SORT}
+
+# (route, collection, explain command body) for every query the routes issue
+QUERY_SHAPES = [
+    ("get_current_user", "user_sessions", {"find": "user_sessions", "filter": {"session_token": "token"}}),
+    ("get_current_user", "users", {"find": "users", "filter": {"id": SAMPLE_ID}}),
+    ("create_session", "users", {"find": "users", "filter": {"email": "student@example.com"}}),
+    ("enforce_session_cap", "user_sessions", {"find": "user_sessions", "filter": {"user_id": SAMPLE_ID}, "sort": {"created_at": -1}, "skip": 10}),
+    ("purge_expired_sessions", "user_sessions", {"find": "user_sessions", "filter": date_range("expires_at", lte=NOW), "limit": 1000}),
+    ("logout", "user_sessions", {"delete": "user_sessions", "deletes": [{"q": {"session_token": "token"}, "limit": 1}]}),
+    ("get_profile", "student_profiles", {"find": "student_profiles", "filter": {"user_id": SAMPLE_ID}}),
+    ("get_drives", "placement_drives", {"find": "placement_drives", "filter": drives_query(), "sort": CATALOG_ORDER}),
+    ("get_drives?company", "placement_drives", {"find": "placement_drives", "filter": drives_query(company="Goo"), "sort": CATALOG_ORDER}),
+    ("get_drives?location", "placement_drives", {"find": "placement_drives", "filter": drives_query(location="Bangalore"), "sort": CATALOG_ORDER}),
+    ("get_drives?deadline", "placement_drives", {"find": "placement_drives", "filter": drives_query(deadline_from=NOW, deadline_to=NOW + timedelta(days=30)), "sort": CATALOG_ORDER}),
+    ("search_drives?q", "placement_drives", {"aggregate": "placement_drives", "pipeline": drive_search_pipeline(q="backend engineer", limit=21), "cursor": {}}),
+    ("search_drives?skills", "placement_drives", {"aggregate": "placement_drives", "pipeline": drive_search_pipeline(skills=["Python", "SQL"], limit=21), "cursor": {}}),
+    ("search_drives?ctc", "placement_drives", {"aggregate": "placement_drives", "pipeline": drive_search_pipeline(ctc_min=10, ctc_max=20, limit=21), "cursor": {}}),
+    ("get_drive", "placement_drives", {"find": "placement_drives", "filter": {"id": SAMPLE_ID}}),
+    ("apply_to_drive", "placement_drives", {"find": "placement_drives", "filter": {"id": SAMPLE_ID}, "projection": {"_id": 0, "status": 1, "application_deadline": 1}}),
+    ("rank_drive_candidates", "applications", {"distinct": "applications", "key": "user_id", "query": {"drive_id": SAMPLE_ID}}),
+    ("export_drive_applications", "applications", {"find": "applications", "filter": {"drive_id": SAMPLE_ID}, "sort": {"applied_at": 1, "id": 1}}),
+    ("export_placements", "applications", {"find": "applications", "filter": {"status": "selected"}, "sort": {"applied_at": 1, "id": 1}}),
+    ("update_application_status", "applications", {"update": "applications", "updates": [{"q": {"id": SAMPLE_ID}, "u": {"$set": {"status": "shortlisted"}}}]}),
+    ("get_test", "mock_tests", {"aggregate": "mock_tests", "pipeline": student_test_pipeline(SAMPLE_ID, 0, 20), "cursor": {}}),
+    ("submit_test", "mock_tests", {"find": "mock_tests", "filter": {"id": SAMPLE_ID}, "projection": {"_id": 0, "questions.correct_answer": 1}}),
+    ("regrade_test", "test_attempts", {"find": "test_attempts", "filter": {"test_id": SAMPLE_ID}}),
+    ("get_my_attempts", "test_attempts", {"find": "test_attempts", "filter": {"user_id": SAMPLE_ID}, "sort": {"attempted_at": -1, "id": -1}}),
+    ("get_my_attempts?cursor", "test_attempts", {"find": "test_attempts", "filter": {"user_id": SAMPLE_ID, **keyset_filter(["attempted_at", "id"], [NOW, SAMPLE_ID], DESCENDING)}, "sort": {"attempted_at": -1, "id": -1}}),
+    ("get_my_attempts", "mock_tests", {"find": "mock_tests", "filter": {"id": {"$in": [SAMPLE_ID]}}}),
+    ("get_my_attempt_summary", "test_attempts", {"aggregate": "test_attempts", "pipeline": attempt_summary_pipeline(SAMPLE_ID), "cursor": {}}),
+    ("get_tests", "mock_tests", {"find": "mock_tests", "filter": {}, "sort": CATALOG_ORDER}),
+    ("get_resources", "resources", {"find": "resources", "filter": {}, "sort": CATALOG_ORDER}),
+    ("delete_resource", "resources", {"delete": "resources", "deletes": [{"q": {"id": SAMPLE_ID}, "limit": 1}]}),
+    ("get_announcements", "announcements", {"find": "announcements", "filter": {}, "sort": {"created_at": -1}, "limit": 10}),
+    ("get_admin_stats", "stats", {"find": "stats", "filter": {"_id": STATS_ID}}),
+    ("reconcile_stats", "applications", {"aggregate": "applications", "pipeline": stats_pipeline(), "cursor": {}}),
+]
+
+# Routes that count whole collections on purpose: their COLLSCAN is reported, not failed
+FULL_SCANS = {"reconcile_stats"}
+
+def lookup_shapes(user_id: str, drive_id: str) -> list:
+    """Pipelines with a $lookup, keyed on a real application so the joins run under executionStats"""
+    return [
+        ("get_my_applications", "applications", {"aggregate": "applications", "pipeline": my_applications_pipeline(user_id), "cursor": {}}),
+        ("get_drive_applications", "applications", {"aggregate": "applications", "pipeline": drive_applications_pipeline(drive_id, limit=101), "cursor": {}}),
+    ]
+
+def plan_stages(node, stages=None):
+    """Collect every stage name of a winning plan, skipping rejected plans and runtime stats"""
+    stages = [] if stages is None else stages
+    if isinstance(node, dict):
+        if isinstance(node.get("stage"), str):
+            stages.append(node["stage"])
+        for key, value in node.items():
+            if key not in ("rejectedPlans", "executionStats"):
+                plan_stages(value, stages)
+    elif isinstance(node, list):
+        for item in node:
+            plan_stages(item, stages)
+    return stages
+
+def lookup_access(node, found=None):
+    """(joined collection, how it was read) for every $lookup in an executionStats explain"""
+    found = [] if found is None else found
+    if isinstance(node, dict):
+        if "$lookup" in node:
+            # Classic engine: per-stage counters next to the stage spec
+            target = node["$lookup"].get("from")
+            if node.get("collectionScans"):
+                found.append((target, "COLLSCAN"))
+            elif node.get("indexesUsed"):
+                found.append((target, "IXSCAN " + ", ".join(node["indexesUsed"])))
+            else:
+                found.append((target, None))
+        elif node.get("stage") == "EQ_LOOKUP":
+            # Slot-based engine: the join strategy shows whether the foreign side used an index
+            target = node.get("foreignCollection", "").split(".", 1)[-1]
+            if node.get("strategy") == "IndexedLoopJoin":
+                found.append((target, f"IXSCAN {node.get('indexName', '')}".strip()))
+            else:
+                found.append((target, f"COLLSCAN ({node.get('strategy')})"))
+        for key, value in node.items():
+            if key not in ("rejectedPlans", "executionStats"):
+                lookup_access(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            lookup_access(item, found)
+    return found
+
+async def verify_indexes(skip_ensure: bool = False) -> int:
+    print("🔎 Verifying query plans...\n")
+
+    try:
+        if not skip_ensure:
+            failed = await ensure_indexes(db)
+            if failed:
+                print(f"⚠️  Could not create: {', '.join(failed)}\n")
+
+        sample = await db.applications.find_one({}, {"_id": 0, "user_id": 1, "drive_id": 1}) or {}
+        shapes = QUERY_SHAPES + lookup_shapes(sample.get("user_id", SAMPLE_ID), sample.get("drive_id", SAMPLE_ID))
+
+        collscans = unexercised = 0
+        for route, collection, command in shapes:
+            verbosity = "executionStats" if "aggregate" in command else "queryPlanner"
+            explain = await db.command({"explain": command, "verbosity": verbosity})
+            stages = plan_stages(explain.get("queryPlanner", explain))
+            lookups = lookup_access(explain)
+            scanned = "COLLSCAN" in stages or any(access and access.startswith("COLLSCAN") for _, access in lookups)
+            if scanned and route in FULL_SCANS:
+                print(f"⚠️  {route:<27} {collection:<18} {' > '.join(stages)} (full count by design)")
+            elif scanned:
+                collscans += 1
+                print(f"❌ {route:<28} {collection:<18} {' > '.join(stages)}")
+            else:
+                print(f"✓ {route:<29} {collection:<18} {' > '.join(stages)}")
+            for target, access in lookups:
+                if access is None:
+                    unexercised += 1
+                print(f"   $lookup {target:<37} {access or 'not exercised (no matching rows)'}")
+
+        print()
+        if unexercised:
+            print(f"⚠️  {unexercised} $lookup stages never ran, seed data (generate_dataset.py) to check them")
+        if collscans:
+            print(f"❌ {collscans} of {len(shapes)} query shapes fall back to COLLSCAN")
+            return 1
+        print(f"✨ All {len(shapes)} query shapes are index-backed")
+        return 0
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(verify_indexes(skip_ensure="--skip-ensure" in sys.argv)))
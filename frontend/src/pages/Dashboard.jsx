@@ -2,6 +2,10 @@ import React, { useEffect, useState } from "react";
 import { Bell, Briefcase, Target, BookOpen, User } from "lucide-react";
 import { useAuth } from "@/context/AuthContext";
 import { api } from "@/services/api";
+import { subscribeEvents } from "@/services/events";
+
+// GET /api/announcements returns the latest 10
+const ANNOUNCEMENTS_LIMIT = 10;
 
 export const Dashboard = () => {
   const { user } = useAuth();
@@ -10,6 +14,15 @@ export const Dashboard = () => {
 
   useEffect(() => {
     fetchData();
+    const unsubscribe = subscribeEvents("announcement", (announcement) =>
+      setAnnouncements((current) => [announcement, ...current].slice(0, ANNOUNCEMENTS_LIMIT))
+    );
+    // The server could not replay everything we missed
+    const unsubscribeReset = subscribeEvents("reset", () => fetchData());
+    return () => {
+      unsubscribe();
+      unsubscribeReset();
+    };
   }, []);
   const fetchData = async () => {
     try {
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from "react";
 import { FileText, CheckCircle, XCircle, CircleDot, Clock } from "lucide-react";
 import { api } from "@/services/api";
+import { subscribeEvents } from "@/services/events";
 
 export const MyApplications = () => {
   const [applications, setApplications] = useState([]);
@@ -8,6 +9,18 @@ export const MyApplications = () => {
 
   useEffect(() => {
     fetchApplications();
+    const unsubscribe = subscribeEvents("application_status", (change) =>
+      setApplications((current) =>
+        current.map((app) =>
+          app.id === change.id ? { ...app, status: change.status } : app
+        )
+      )
+    );
+    const unsubscribeReset = subscribeEvents("reset", () => fetchApplications());
+    return () => {
+      unsubscribe();
+      unsubscribeReset();
+    };
   }, []);
   const fetchApplications = async () => {
     try {
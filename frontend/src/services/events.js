@@ -0,0 +1,24 @@
+import { BACKEND_URL } from '@/config/constants';
+
+// One EventSource shared by every subscriber; the browser reconnects on its own
+// and sends Last-Event-ID so missed events are replayed.
+let source = null;
+let subscribers = 0;
+
+export const subscribeEvents = (type, handler) => {
+  if (!source) {
+    source = new EventSource(`${BACKEND_URL}/api/events`, { withCredentials: true });
+  }
+  subscribers += 1;
+  const listener = (event) => handler(JSON.parse(event.data));
+  source.addEventListener(type, listener);
+
+  return () => {
+    source?.removeEventListener(type, listener);
+    subscribers -= 1;
+    if (subscribers === 0) {
+      source?.close();
+      source = null;
+    }
+  };
+};